@@ -22,6 +22,11 @@ from app.models.student import Student
 from app.models.event import Event
 from app.models.point_transaction import PointTransaction
 from app.models.user import User   # ✅ fixed
+from app.models.scoring_weight import ScoringWeight
+from app.models.department_total import DepartmentTotal
+from app.models.student_daily_points import StudentDailyPoints
+from app.models.rank_history import RankHistory
+from app.models.scoring_version import ScoringVersion
 
 
 
@@ -0,0 +1,34 @@
+"""add scoring_versions table
+
+Revision ID: 2e6a9d3f7b15
+Revises: 8c1d4e7f2a63
+Create Date: 2026-10-17 20:31:09.640512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e6a9d3f7b15'
+down_revision: Union[str, Sequence[str], None] = '8c1d4e7f2a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scoring_versions',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO scoring_versions (name, version, updated_at) VALUES ('totals', 0, now())")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('scoring_versions')
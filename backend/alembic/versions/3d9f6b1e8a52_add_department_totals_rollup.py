@@ -0,0 +1,59 @@
+"""add department_totals rollup
+
+Revision ID: 3d9f6b1e8a52
+Revises: e7a4c0b95d31
+Create Date: 2026-10-17 16:42:08.913620
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9f6b1e8a52'
+down_revision: Union[str, Sequence[str], None] = 'e7a4c0b95d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('department_totals',
+    sa.Column('department_id', sa.Integer(), nullable=False),
+    sa.Column('academics_points', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('sports_points', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('cultural_points', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('technical_points', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('social_points', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('composite_points', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('wins', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('student_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['department_id'], ['departments.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('department_id')
+    )
+    # Seed the rollup from the current student totals
+    op.execute(
+        """
+        INSERT INTO department_totals (
+            department_id, academics_points, sports_points, cultural_points,
+            technical_points, social_points, composite_points, wins,
+            student_count, updated_at
+        )
+        SELECT s.department_id,
+               SUM(st.academics_points), SUM(st.sports_points), SUM(st.cultural_points),
+               SUM(st.technical_points), SUM(st.social_points), SUM(st.composite_points),
+               SUM(st.wins), COUNT(*), now()
+        FROM student_totals st
+        JOIN students s ON s.id = st.student_id
+        WHERE s.department_id IS NOT NULL
+        GROUP BY s.department_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('department_totals')
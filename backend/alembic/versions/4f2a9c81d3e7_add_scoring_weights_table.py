@@ -0,0 +1,38 @@
+"""add scoring_weights table
+
+Revision ID: 4f2a9c81d3e7
+Revises: dc0778622500
+Create Date: 2026-10-17 11:40:08.214377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2a9c81d3e7'
+down_revision: Union[str, Sequence[str], None] = 'dc0778622500'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    scoring_weights = op.create_table('scoring_weights',
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('weight', sa.Float(), nullable=False),
+    sa.Column('cap', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('category')
+    )
+    # Plain sum, matching how composite_points was computed so far
+    op.bulk_insert(scoring_weights, [
+        {'category': category, 'weight': 1.0, 'cap': None}
+        for category in ['academics', 'sports', 'cultural', 'technical', 'social']
+    ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('scoring_weights')
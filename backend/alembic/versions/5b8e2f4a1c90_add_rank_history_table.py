@@ -0,0 +1,35 @@
+"""add rank_history table
+
+Revision ID: 5b8e2f4a1c90
+Revises: a16c3e7d9f20
+Create Date: 2026-10-17 18:10:27.554019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2f4a1c90'
+down_revision: Union[str, Sequence[str], None] = 'a16c3e7d9f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rank_history',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('composite_points', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('student_id', 'day')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rank_history')
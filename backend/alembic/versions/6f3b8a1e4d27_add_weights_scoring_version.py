@@ -0,0 +1,29 @@
+"""add weights scoring version
+
+Revision ID: 6f3b8a1e4d27
+Revises: 2e6a9d3f7b15
+Create Date: 2026-10-17 20:58:36.205914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f3b8a1e4d27'
+down_revision: Union[str, Sequence[str], None] = '2e6a9d3f7b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Award transactions lock this row FOR SHARE, so it must exist up front
+    op.execute("INSERT INTO scoring_versions (name, version, updated_at) VALUES ('weights', 0, now())")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM scoring_versions WHERE name = 'weights'")
@@ -0,0 +1,28 @@
+"""add revision to student_totals
+
+Revision ID: 8c1d4e7f2a63
+Revises: 5b8e2f4a1c90
+Create Date: 2026-10-17 20:02:41.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1d4e7f2a63'
+down_revision: Union[str, Sequence[str], None] = '5b8e2f4a1c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('student_totals', sa.Column('revision', sa.BigInteger(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('student_totals', 'revision')
@@ -0,0 +1,51 @@
+"""unique participation per student and event
+
+Revision ID: 9b3e5d2c7a14
+Revises: 4f2a9c81d3e7
+Create Date: 2026-10-17 13:05:27.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e5d2c7a14'
+down_revision: Union[str, Sequence[str], None] = '4f2a9c81d3e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTICIPATION_REASON = 'Student opted to participate'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the earliest registration of each duplicate pair. Participation rows
+    # carry no points, so the totals are unaffected.
+    duplicates = f"""
+        SELECT id FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY student_id, event_id ORDER BY id
+            ) AS n
+            FROM point_transactions
+            WHERE reason = '{PARTICIPATION_REASON}'
+        ) AS ranked
+        WHERE n > 1
+    """
+    op.execute(f"DELETE FROM admin_notification_status WHERE point_transaction_id IN ({duplicates})")
+    op.execute(f"DELETE FROM point_transactions WHERE id IN ({duplicates})")
+
+    op.create_index(
+        'uq_point_transactions_participation',
+        'point_transactions',
+        ['student_id', 'event_id'],
+        unique=True,
+        postgresql_where=sa.text(f"reason = '{PARTICIPATION_REASON}'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_point_transactions_participation', table_name='point_transactions')
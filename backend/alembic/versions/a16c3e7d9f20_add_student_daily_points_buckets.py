@@ -0,0 +1,46 @@
+"""add student_daily_points buckets
+
+Revision ID: a16c3e7d9f20
+Revises: 3d9f6b1e8a52
+Create Date: 2026-10-17 17:25:41.308152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a16c3e7d9f20'
+down_revision: Union[str, Sequence[str], None] = '3d9f6b1e8a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('student_daily_points',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('points', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('wins', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('student_id', 'day', 'category')
+    )
+    op.create_index(
+        'ix_student_daily_points_day',
+        'student_daily_points',
+        ['day', 'student_id'],
+        unique=False,
+        postgresql_include=['category', 'points', 'wins'],
+    )
+    # Existing ledger rows are bucketed by `python -m app.cli backfill-buckets`,
+    # which commits per student-id range instead of in this migration
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_student_daily_points_day', table_name='student_daily_points')
+    op.drop_table('student_daily_points')
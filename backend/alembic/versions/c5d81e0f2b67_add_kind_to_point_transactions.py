@@ -0,0 +1,69 @@
+"""add kind to point_transactions
+
+Revision ID: c5d81e0f2b67
+Revises: 9b3e5d2c7a14
+Create Date: 2026-10-17 14:22:51.318840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d81e0f2b67'
+down_revision: Union[str, Sequence[str], None] = '9b3e5d2c7a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# TransactionKind values
+PARTICIPATION, AWARD, WINNER = 1, 2, 3
+PARTICIPATION_REASON = 'Student opted to participate'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('point_transactions', sa.Column('kind', sa.SmallInteger(), nullable=True))
+    op.execute(
+        f"""
+        UPDATE point_transactions
+        SET kind = CASE reason
+            WHEN '{PARTICIPATION_REASON}' THEN {PARTICIPATION}
+            WHEN 'winner' THEN {WINNER}
+            ELSE {AWARD}
+        END
+        """
+    )
+    op.alter_column('point_transactions', 'kind',
+               existing_type=sa.SmallInteger(),
+               nullable=False,
+               server_default=str(AWARD))
+
+    op.create_index('ix_point_transactions_event_kind', 'point_transactions', ['event_id', 'kind'], unique=False)
+    op.create_index('ix_point_transactions_student_kind', 'point_transactions', ['student_id', 'kind'], unique=False)
+
+    # The one-registration-per-event rule now keys on kind instead of reason
+    op.drop_index('uq_point_transactions_participation', table_name='point_transactions')
+    op.create_index(
+        'uq_point_transactions_participation',
+        'point_transactions',
+        ['student_id', 'event_id'],
+        unique=True,
+        postgresql_where=sa.text(f'kind = {PARTICIPATION}'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_point_transactions_participation', table_name='point_transactions')
+    op.create_index(
+        'uq_point_transactions_participation',
+        'point_transactions',
+        ['student_id', 'event_id'],
+        unique=True,
+        postgresql_where=sa.text(f"reason = '{PARTICIPATION_REASON}'"),
+    )
+    op.drop_index('ix_point_transactions_student_kind', table_name='point_transactions')
+    op.drop_index('ix_point_transactions_event_kind', table_name='point_transactions')
+    op.drop_column('point_transactions', 'kind')
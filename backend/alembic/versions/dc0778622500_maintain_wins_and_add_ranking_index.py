@@ -0,0 +1,56 @@
+"""maintain wins and add ranking index
+
+Revision ID: dc0778622500
+Revises: b87608f7d6b6
+Create Date: 2026-10-17 09:12:41.530214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dc0778622500'
+down_revision: Union[str, Sequence[str], None] = 'b87608f7d6b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Backfill wins from the ledger before it becomes the source of truth
+    op.execute(
+        """
+        UPDATE student_totals AS st
+        SET wins = COALESCE((
+            SELECT COUNT(*) FROM point_transactions AS pt
+            WHERE pt.student_id = st.student_id AND pt.reason = 'winner'
+        ), 0)
+        """
+    )
+    op.alter_column('student_totals', 'wins',
+               existing_type=sa.Integer(),
+               nullable=False,
+               server_default='0')
+    op.create_index(
+        'ix_student_totals_ranking',
+        'student_totals',
+        [
+            sa.text('composite_points DESC'),
+            sa.text('academics_points DESC'),
+            sa.text('wins DESC'),
+            sa.text('technical_points DESC'),
+        ],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_student_totals_ranking', table_name='student_totals')
+    op.alter_column('student_totals', 'wins',
+               existing_type=sa.Integer(),
+               nullable=True,
+               server_default=None)
@@ -0,0 +1,52 @@
+"""index point_transactions access paths and unseen notifications
+
+Revision ID: e7a4c0b95d31
+Revises: c5d81e0f2b67
+Create Date: 2026-10-17 15:03:12.477205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a4c0b95d31'
+down_revision: Union[str, Sequence[str], None] = 'c5d81e0f2b67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Timeline / achievements: WHERE student_id = ? ORDER BY created_at DESC
+    op.create_index(
+        'ix_point_transactions_student_created',
+        'point_transactions',
+        ['student_id', sa.text('created_at DESC')],
+        unique=False,
+    )
+    # Totals aggregation: GROUP BY student_id, category over points and kind
+    op.create_index(
+        'ix_point_transactions_student_category',
+        'point_transactions',
+        ['student_id', 'category'],
+        unique=False,
+        postgresql_include=['points', 'kind'],
+    )
+    # unread_count and the participation log only look at unseen rows
+    op.create_index(
+        'ix_admin_notification_status_unseen',
+        'admin_notification_status',
+        ['point_transaction_id'],
+        unique=False,
+        postgresql_where=sa.text('seen = false'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_admin_notification_status_unseen', table_name='admin_notification_status')
+    op.drop_index('ix_point_transactions_student_category', table_name='point_transactions')
+    op.drop_index('ix_point_transactions_student_created', table_name='point_transactions')
@@ -0,0 +1,137 @@
+# app/cli.py
+"""
+Maintenance commands, run from the backend directory:
+
+    python -m app.cli rebuild-totals [--verify] [--chunk-size N]
+    python -m app.cli import-awards FILE [--format csv|jsonl] [--chunk-size N]
+    python -m app.cli query-plans [--json]
+    python -m app.cli backfill-buckets [--chunk-size N]
+    python -m app.cli rank-history [--day YYYY-MM-DD]
+
+rank-history is the nightly job; schedule it shortly before midnight UTC,
+e.g. with cron:  55 23 * * *  cd backend && python -m app.cli rank-history
+
+These run in their own process. Rebuilds and imports reach running servers
+through the shared totals generation (scoring_versions), which they check
+every few seconds before reloading their in-memory leaderboard.
+"""
+import argparse
+import json
+import sys
+from datetime import date
+
+from app.database import SessionLocal
+from app.models import admin_notification_status  # noqa: F401  (register all mappers)
+from app.services.award_import import DEFAULT_CHUNK_SIZE, IMPORT_FORMATS, import_awards
+from app.services.daily_buckets import backfill_buckets
+from app.services.query_plans import compare_query_plans, format_query_plans
+from app.services.rank_history import run_rank_history_job
+from app.services.scoring_service import rebuild_all_totals, verify_all_totals
+
+
+def rebuild_totals(args):
+    db = SessionLocal()
+    try:
+        if args.verify:
+            result = verify_all_totals(db, chunk_size=args.chunk_size or 1000)
+        else:
+            result = rebuild_all_totals(db, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+    print(json.dumps(result, indent=2, default=str))
+
+
+def import_award_file(args):
+    fmt = args.format or args.file.rsplit(".", 1)[-1].lower()
+    if fmt not in IMPORT_FORMATS:
+        sys.exit("Format must be csv or jsonl (use --format)")
+
+    def report(stats):
+        print(
+            f"chunk {stats['chunks']}: {stats['imported']} imported, {stats['failed']} failed",
+            file=sys.stderr,
+        )
+
+    db = SessionLocal()
+    try:
+        with open(args.file, encoding="utf-8-sig", newline="") as stream:
+            result = import_awards(db, stream, fmt, chunk_size=args.chunk_size, progress=report)
+    finally:
+        db.close()
+    print(json.dumps(result, indent=2))
+
+
+def query_plans(args):
+    db = SessionLocal()
+    try:
+        result = compare_query_plans(db)
+    finally:
+        db.close()
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print("\n".join(format_query_plans(result)))
+
+
+def backfill_daily_buckets(args):
+    db = SessionLocal()
+    try:
+        result = backfill_buckets(db, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+    print(json.dumps(result, indent=2))
+
+
+def rank_history(args):
+    db = SessionLocal()
+    try:
+        result = run_rank_history_job(db, day=args.day)
+    finally:
+        db.close()
+    print(json.dumps(result, indent=2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-totals", help="Rebuild student_totals from point_transactions"
+    )
+    rebuild.add_argument("--verify", action="store_true", help="Only report drifted students")
+    rebuild.add_argument("--chunk-size", type=int, default=None, help="Student-id range per statement")
+    rebuild.set_defaults(handler=rebuild_totals)
+
+    awards = commands.add_parser(
+        "import-awards", help="Import point awards from a CSV or JSONL file"
+    )
+    awards.add_argument("file", help="Path to the .csv or .jsonl file")
+    awards.add_argument("--format", choices=IMPORT_FORMATS, default=None)
+    awards.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per commit")
+    awards.set_defaults(handler=import_award_file)
+
+    plans = commands.add_parser(
+        "query-plans",
+        help="EXPLAIN ANALYZE the hot ledger queries on the live tables and on unindexed temp copies",
+    )
+    plans.add_argument("--json", action="store_true", help="Print the raw result as JSON")
+    plans.set_defaults(handler=query_plans)
+
+    buckets = commands.add_parser(
+        "backfill-buckets", help="Build the daily point buckets from point_transactions"
+    )
+    buckets.add_argument("--chunk-size", type=int, default=1000, help="Student-id range per commit")
+    buckets.set_defaults(handler=backfill_daily_buckets)
+
+    history = commands.add_parser(
+        "rank-history", help="Record today's ranks and compact old rank history"
+    )
+    history.add_argument("--day", type=date.fromisoformat, default=None, help="Record under this day instead of today (UTC)")
+    history.set_defaults(handler=rank_history)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 # Load environment variables from .env
 load_dotenv()
@@ -19,10 +19,34 @@ engine = create_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-# Dependency to get a DB session
+# Dependency to get a DB session.
+# One session = one unit of work: services only add/flush, the route commits
+# exactly once when everything succeeded, and any exception rolls it all back.
 def get_db():
     db = SessionLocal()
     try:
         yield db
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
+
+def after_commit(db: Session, callback):
+    """
+    Run `callback` once the session's current transaction commits.
+    Callbacks are dropped if it rolls back, so in-memory state never sees
+    changes that were not persisted. They must not use the session itself.
+    """
+    db.info.setdefault("after_commit", []).append(callback)
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session):
+    for callback in session.info.pop("after_commit", []):
+        callback()
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_after_commit(session, transaction):
+    # Fires after after_commit, so anything left here was rolled back or closed
+    if transaction.parent is None:
+        session.info.pop("after_commit", None)
@@ -2,7 +2,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 # Import database objects
-from app.database import engine, Base
+from app.database import engine, Base, SessionLocal
 # Import all models to ensure Base knows about them for table creation
 # Import all models to ensure Base knows about them for table creation
 from app.models import (
@@ -11,11 +11,19 @@ from app.models import (
     event,
     point_transaction,
     user,
-    admin_notification_status  # ✅ add this line
+    admin_notification_status,  # ✅ add this line
+    scoring_weight,
+    department_total,
+    student_daily_points,
+    rank_history,
+    scoring_version,
 )
 
 from app.routers import departments, students, events, leaderboard, auth
 from app.routers import snapshots, reveal  # ✅ added snapshots & reveal
+from app.routers import admin, stream
+from app.services.leaderboard_index import leaderboard_index
+from app.services.scoring_versions import check_totals_generation
 
 # -------------------- DB Setup --------------------
 def create_db_tables():
@@ -48,6 +56,20 @@ app.include_router(leaderboard.router, prefix="/api")
 app.include_router(auth.router, prefix="/api")
 app.include_router(snapshots.router, prefix="/api")  # ✅ snapshots
 app.include_router(reveal.router, prefix="/api")     # ✅ reveal
+app.include_router(admin.router, prefix="/api")
+app.include_router(stream.router, prefix="/api")
+
+@app.on_event("startup")
+def load_leaderboard_index():
+    # Seed the in-memory leaderboard once; scoring updates keep it current.
+    # The shared totals generation is read first, so a rebuild committed
+    # by another process while loading is still noticed.
+    db = SessionLocal()
+    try:
+        check_totals_generation(db, force=True)
+        leaderboard_index.ensure_loaded(db)
+    finally:
+        db.close()
 
 # -------------------- Root Endpoint --------------------
 @app.get("/", tags=["Root"])
@@ -6,6 +6,11 @@ from .point_transaction import PointTransaction
 from .user import User
 from .student_total import StudentTotal
 from .final_snapshot import FinalSnapshot  # ✅ newly added
+from .scoring_weight import ScoringWeight
+from .department_total import DepartmentTotal
+from .student_daily_points import StudentDailyPoints
+from .rank_history import RankHistory
+from .scoring_version import ScoringVersion
 
 __all__ = [
     "Department",
@@ -15,4 +20,9 @@ __all__ = [
     "User",
     "StudentTotal",
     "FinalSnapshot",  # ✅ include in __all__
+    "ScoringWeight",
+    "DepartmentTotal",
+    "StudentDailyPoints",
+    "RankHistory",
+    "ScoringVersion",
 ]
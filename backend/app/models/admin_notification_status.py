@@ -1,5 +1,5 @@
 # app/models/admin_notification_status.py
-from sqlalchemy import Column, Integer, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -11,3 +11,11 @@ class AdminNotificationStatus(Base):
     seen = Column(Boolean, default=False)
 
     transaction = relationship("PointTransaction", backref="admin_notification_status")
+
+
+# Only unseen rows are ever counted or listed, and they are few
+Index(
+    "ix_admin_notification_status_unseen",
+    AdminNotificationStatus.point_transaction_id,
+    postgresql_where=AdminNotificationStatus.seen == False,
+)
@@ -0,0 +1,27 @@
+# app/models/department_total.py
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, func
+from app.database import Base
+
+class DepartmentTotal(Base):
+    """
+    Per-department rollup of student_totals, kept current by the scoring
+    service in the same transaction as the student rows it sums.
+    student_count is the number of the department's students on the
+    leaderboard (those with a student_totals row).
+    """
+    __tablename__ = "department_totals"
+
+    department_id = Column(Integer, ForeignKey("departments.id", ondelete="CASCADE"), primary_key=True)
+
+    # Sums over the department's student_totals
+    academics_points = Column(Integer, default=0, server_default="0", nullable=False)
+    sports_points = Column(Integer, default=0, server_default="0", nullable=False)
+    cultural_points = Column(Integer, default=0, server_default="0", nullable=False)
+    technical_points = Column(Integer, default=0, server_default="0", nullable=False)
+    social_points = Column(Integer, default=0, server_default="0", nullable=False)
+    composite_points = Column(Integer, default=0, server_default="0", nullable=False)
+    wins = Column(Integer, default=0, server_default="0", nullable=False)
+
+    student_count = Column(Integer, default=0, server_default="0", nullable=False)
+
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -1,7 +1,27 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+import enum
+
+from sqlalchemy import Column, Integer, SmallInteger, String, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+# Reason stored on the zero-point row created when a student registers for an event
+PARTICIPATION_REASON = "Student opted to participate"
+
+class TransactionKind(enum.IntEnum):
+    """What a ledger row represents; stored as a small integer in `kind`."""
+    PARTICIPATION = 1
+    AWARD = 2
+    WINNER = 3
+    ADJUSTMENT = 4
+
+def kind_for_reason(reason):
+    """Kind of a transaction created with the given free-text reason."""
+    if reason == "winner":
+        return TransactionKind.WINNER
+    if reason == PARTICIPATION_REASON:
+        return TransactionKind.PARTICIPATION
+    return TransactionKind.AWARD
+
 class PointTransaction(Base):
     __tablename__ = "point_transactions"
 
@@ -10,8 +30,39 @@ class PointTransaction(Base):
     event_id = Column(Integer, ForeignKey("events.id"))
     points = Column(Integer)
     category = Column(String)
-    reason = Column(String, nullable=True)
+    reason = Column(String, nullable=True)  # free text shown to users; queries use `kind`
+    kind = Column(SmallInteger, nullable=False, default=TransactionKind.AWARD, server_default="2")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # ✅ timezone-aware
 
     student = relationship("Student", back_populates="point_transactions")
     event = relationship("Event")
+
+
+# A student can register for an event only once; participation inserts use
+# ON CONFLICT DO NOTHING against this index instead of checking first
+Index(
+    "uq_point_transactions_participation",
+    PointTransaction.student_id,
+    PointTransaction.event_id,
+    unique=True,
+    postgresql_where=PointTransaction.kind == int(TransactionKind.PARTICIPATION),
+)
+
+# Participants of an event, wins of a student, ...
+Index("ix_point_transactions_event_kind", PointTransaction.event_id, PointTransaction.kind)
+Index("ix_point_transactions_student_kind", PointTransaction.student_id, PointTransaction.kind)
+
+# Timeline and achievements: a student's rows, newest first
+Index(
+    "ix_point_transactions_student_created",
+    PointTransaction.student_id,
+    PointTransaction.created_at.desc(),
+)
+
+# Totals aggregation per (student, category) as an index-only scan
+Index(
+    "ix_point_transactions_student_category",
+    PointTransaction.student_id,
+    PointTransaction.category,
+    postgresql_include=["points", "kind"],
+)
@@ -0,0 +1,17 @@
+# app/models/rank_history.py
+from sqlalchemy import Column, Date, ForeignKey, Integer
+from app.database import Base
+
+class RankHistory(Base):
+    """
+    A student's college rank and composite at the end of a day, recorded
+    by the rank history job. Old points are thinned to one per week and
+    eventually dropped, so the table stays bounded.
+    """
+    __tablename__ = "rank_history"
+
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    rank = Column(Integer, nullable=False)
+    composite_points = Column(Integer, nullable=False)
@@ -0,0 +1,18 @@
+# app/models/scoring_version.py
+from sqlalchemy import BigInteger, Column, DateTime, String, func
+from app.database import Base
+
+class ScoringVersion(Base):
+    """
+    Named counters shared by every process that writes scores (API
+    workers, CLI jobs). "totals" moves whenever student_totals change in
+    bulk outside the per-award path (rebuilds, imports), so a server can
+    tell its in-memory leaderboard has gone stale; "weights" moves with
+    every change to scoring_weights.
+    """
+    __tablename__ = "scoring_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, default=0, server_default="0", nullable=False)
+
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
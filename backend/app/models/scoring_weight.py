@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, Float
+from app.database import Base
+
+class ScoringWeight(Base):
+    """
+    Per-category weight (and optional cap on the category's points) used to
+    build composite_points. A missing row means weight 1.0 with no cap.
+    """
+    __tablename__ = "scoring_weights"
+
+    category = Column(String, primary_key=True)
+    weight = Column(Float, default=1.0, nullable=False)
+    cap = Column(Integer, nullable=True)
@@ -0,0 +1,27 @@
+# app/models/student_daily_points.py
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, String
+from app.database import Base
+
+class StudentDailyPoints(Base):
+    """
+    Points and wins per student, UTC day and category, pre-aggregated from
+    point_transactions by the scoring service so time-windowed leaderboards
+    sum a few buckets instead of scanning the ledger.
+    """
+    __tablename__ = "student_daily_points"
+
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)
+
+    points = Column(Integer, default=0, server_default="0", nullable=False)
+    wins = Column(Integer, default=0, server_default="0", nullable=False)
+
+
+# Window sums: WHERE day BETWEEN ... GROUP BY student_id as an index-only scan
+Index(
+    "ix_student_daily_points_day",
+    StudentDailyPoints.day,
+    StudentDailyPoints.student_id,
+    postgresql_include=["category", "points", "wins"],
+)
@@ -1,5 +1,5 @@
 # app/models/student_total.py
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, func
+from sqlalchemy import BigInteger, Column, Integer, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -26,8 +26,21 @@ class StudentTotal(Base):
     
     # Timestamp to track when the totals were last updated
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    wins = Column(Integer, default=0)
+    # Number of 'winner' transactions, maintained by the scoring service
+    wins = Column(Integer, default=0, server_default="0", nullable=False)
+    # Bumped by every write, so in-memory copies can tell newer totals from older
+    revision = Column(BigInteger, server_default="1", nullable=False)
 
 
     # Relationship back to Student model
-    student = relationship("Student", back_populates="total", uselist=False)
\ No newline at end of file
+    student = relationship("Student", back_populates="total", uselist=False)
+
+
+# Matches the leaderboard tie-break order so ranking is a single index scan
+Index(
+    "ix_student_totals_ranking",
+    StudentTotal.composite_points.desc(),
+    StudentTotal.academics_points.desc(),
+    StudentTotal.wins.desc(),
+    StudentTotal.technical_points.desc(),
+)
@@ -0,0 +1,89 @@
+# routers/admin.py
+import time
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.dependencies import get_current_admin_user
+from app.models.user import User
+from app import schemas
+from app.services.rank_history import run_rank_history_job
+from app.services.scoring_engine import get_weights, merge_weights, update_weights
+from app.services.scoring_service import rebuild_all_totals, verify_all_totals
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+# --------------------------- Totals rebuild / reconciliation ---------------------------
+@router.post("/totals/rebuild")
+def rebuild_totals(
+    verify_only: bool = False,
+    chunk_size: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user),
+):
+    """
+    Rebuild every student's totals from point_transactions.
+    With verify_only=true nothing is written; drifted students are reported.
+    chunk_size splits the work into student-id ranges for very large ledgers.
+    """
+    if verify_only:
+        return verify_all_totals(db, chunk_size=chunk_size or 1000)
+    return rebuild_all_totals(db, chunk_size=chunk_size)
+
+# --------------------------- Scoring weights ---------------------------
+@router.get("/scoring/weights", response_model=List[schemas.ScoringWeightResponse])
+def get_scoring_weights(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user),
+):
+    weights = get_weights(db)
+    return [
+        {"category": category, "weight": w.weight, "cap": w.cap}
+        for category, w in weights.items()
+    ]
+
+
+@router.put("/scoring/weights")
+def put_scoring_weights(
+    updates: List[schemas.ScoringWeightBase],
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user),
+):
+    """
+    Change category weights/caps (categories not listed keep their current
+    values) and re-score every student's composite in one pass.
+    """
+    try:
+        weights = merge_weights(get_weights(db), updates)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    started = time.perf_counter()
+    rescored = update_weights(db, weights)
+    db.commit()
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    return {
+        "weights": [
+            {"category": category, "weight": w.weight, "cap": w.cap}
+            for category, w in weights.items()
+        ],
+        "students_rescored": rescored,
+        "elapsed_ms": elapsed_ms,
+    }
+
+# --------------------------- Rank history ---------------------------
+@router.post("/rank_history/record")
+def record_rank_history(
+    day: Optional[date] = None,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user),
+):
+    """
+    Run the nightly rank history job now: record every ranked student's
+    current rank for `day` (today, UTC) and compact old points.
+    """
+    return run_rank_history_job(db, day)
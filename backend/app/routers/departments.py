@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.department import Department
+from app.services.leaderboard_index import leaderboard_index
+from app.services.scoring_events import scoring_events
 from app import schemas
 
 router = APIRouter(prefix="/departments", tags=["departments"])
@@ -24,6 +26,8 @@ def create_department(department: schemas.DepartmentCreate, db: Session = Depend
     db.add(db_department)
     db.commit()
     db.refresh(db_department)
+    leaderboard_index.set_department(db_department.id, db_department.name)
+    scoring_events.publish_reset("departments")
     return db_department
 
 @router.put("/{department_id}", response_model=schemas.DepartmentResponse)
@@ -34,6 +38,8 @@ def update_department(department_id: int, department: schemas.DepartmentCreate,
     db_department.name = department.name
     db.commit()
     db.refresh(db_department)
+    leaderboard_index.set_department(db_department.id, db_department.name)
+    scoring_events.publish_reset("departments")
     return db_department
 
 @router.delete("/{department_id}", status_code=204)
@@ -43,3 +49,5 @@ def delete_department(department_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Department not found")
     db.delete(db_department)
     db.commit()
+    leaderboard_index.remove_department(department_id)
+    scoring_events.publish_reset("departments")
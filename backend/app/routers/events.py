@@ -1,16 +1,27 @@
 # app/routers/events.py
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+import codecs
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, status, Body, File, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List
+from sqlalchemy import desc, distinct, exists, func, insert
+from typing import List, Optional
 
 from app.database import get_db
 from app.models.event import Event
-from app.models.point_transaction import PointTransaction
+from app.models.point_transaction import PointTransaction, TransactionKind, kind_for_reason
 from app.models.student import Student
 from app.models.user import User
 from app.models.admin_notification_status import AdminNotificationStatus
-from app.services.scoring_service import recalculate_student_totals
+from app.services.notifications import mark_seen, notification_feed, unread_count
+from app.services.participation import Registration, register_participation
+from app.services.award_import import DEFAULT_CHUNK_SIZE, IMPORT_FORMATS, import_awards
+from app.services.scoring_service import (
+    apply_point_delta,
+    apply_point_deltas,
+    delete_transactions,
+)
 from app.dependencies import get_current_admin_user
 from app import schemas
 
@@ -33,7 +44,7 @@ def get_participation_logs(
         .join(Event, PointTransaction.event_id == Event.id)
         .join(AdminNotificationStatus, AdminNotificationStatus.point_transaction_id == PointTransaction.id)
         .filter(
-            PointTransaction.reason == "Student opted to participate",
+            PointTransaction.kind == TransactionKind.PARTICIPATION,
             AdminNotificationStatus.seen == False  # 👈 ONLY unseen notifications!
         )
         .order_by(desc(PointTransaction.id))
@@ -43,6 +54,7 @@ def get_participation_logs(
 
     return [
         {
+            "id": p.id,
             "student_name": s.name,
             "event_title": e.title,
             "timestamp": str(p.created_at),
@@ -61,54 +73,17 @@ def participate_in_event(
     data: schemas.ParticipationRequest = Body(...),
     db: Session = Depends(get_db),
 ):
-    student_id = data.student_id
-    event_id = data.event_id
-
-    event = db.query(Event).filter(Event.id == event_id).first()
-    if not event:
+    # One round trip: insert-if-absent of the participation row, its admin
+    # notification and the student's totals row (see register_participation)
+    result = register_participation(db, data.student_id, data.event_id)
+    if result == Registration.EVENT_NOT_FOUND:
         raise HTTPException(status_code=404, detail="Event not found")
-
-    student = db.query(Student).filter(Student.id == student_id).first()
-    if not student:
+    if result == Registration.STUDENT_NOT_FOUND:
         raise HTTPException(status_code=404, detail="Student not found")
-
-    existing = (
-        db.query(PointTransaction)
-        .filter(
-            PointTransaction.student_id == student_id,
-            PointTransaction.event_id == event_id,
-            PointTransaction.reason == "Student opted to participate",
-        )
-        .first()
-    )
-    if existing:
+    if result == Registration.ALREADY_REGISTERED:
         raise HTTPException(status_code=400, detail="Already registered for this event")
 
-    category = event.category if event.category in VALID_CATEGORIES else "academics"
-
-    # 1️⃣ Create point transaction
-    transaction = PointTransaction(
-        student_id=student_id,
-        event_id=event_id,
-        points=0,
-        category=category,
-        reason="Student opted to participate",
-    )
-    db.add(transaction)
-    db.commit()
-    db.refresh(transaction)
-
-    # 2️⃣ Create admin notification record
-    notification = AdminNotificationStatus(
-        point_transaction_id=transaction.id,
-        seen=False
-    )
-    db.add(notification)
     db.commit()
-
-    # 3️⃣ Recalculate student totals
-    recalculate_student_totals(db, student_id)
-
     return {"message": "Participation registered successfully"}
 
 
@@ -139,13 +114,18 @@ def award_points(
         points=point_award.points,
         category=point_award.category,
         reason=point_award.reason,
-        awarded_by=admin_user.id,
+        kind=kind_for_reason(point_award.reason),
     )
     db.add(transaction)
+    apply_point_delta(
+        db,
+        point_award.student_id,
+        point_award.category,
+        point_award.points,
+        is_win=transaction.kind == TransactionKind.WINNER,
+    )
     db.commit()
     db.refresh(transaction)
-
-    recalculate_student_totals(db, point_award.student_id)
     return transaction
 
 
@@ -170,28 +150,71 @@ def award_points_bulk(
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    awarded_students = []
-
-    for student_id in student_ids:
-        student = db.query(Student).filter(Student.id == student_id).first()
-        if not student:
-            continue
-
-        transaction = PointTransaction(
-            student_id=student_id,
-            event_id=event_id,
-            points=points,
-            category=category,
-            reason=reason,
-            awarded_by=admin_user.id,
+    # One query validates every ID; unknown IDs are reported, duplicates collapsed
+    requested = list(dict.fromkeys(student_ids))
+    existing = {
+        sid for (sid,) in db.query(Student.id).filter(Student.id.in_(requested)).all()
+    }
+    awarded_students = [sid for sid in requested if sid in existing]
+    skipped_students = [sid for sid in requested if sid not in existing]
+
+    kind = kind_for_reason(reason)
+    if awarded_students:
+        # One multi-row INSERT for the ledger, one upsert for all totals
+        db.execute(
+            insert(PointTransaction),
+            [
+                {
+                    "student_id": sid,
+                    "event_id": event_id,
+                    "points": points,
+                    "category": category,
+                    "reason": reason,
+                    "kind": kind,
+                }
+                for sid in awarded_students
+            ],
+        )
+        apply_point_deltas(
+            db,
+            [(sid, category, points, kind == TransactionKind.WINNER) for sid in awarded_students],
         )
-        db.add(transaction)
-        db.flush()
-        recalculate_student_totals(db, student_id)
-        awarded_students.append(student_id)
 
     db.commit()
-    return {"awarded_to": awarded_students, "points": points, "category": category}
+    return {
+        "awarded_to": awarded_students,
+        "skipped": skipped_students,
+        "points": points,
+        "category": category,
+    }
+
+
+# ---------------------------
+# IMPORT AWARDS FROM A FILE
+# ---------------------------
+
+@router.post("/award_points/import")
+def import_award_file(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or jsonl; guessed from the file name if omitted"),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=50000),
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user),
+):
+    """
+    Import a CSV (with a header row) or JSONL file of awards with columns
+    student_id, event_id, points, category, reason. The upload is read as a
+    stream and committed chunk by chunk; bad rows are reported, not fatal.
+    """
+    fmt = (format or (file.filename or "").rsplit(".", 1)[-1]).lower()
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Format must be csv or jsonl")
+
+    text = codecs.getreader("utf-8-sig")(file.file)
+    try:
+        return import_awards(db, text, fmt, chunk_size=chunk_size)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
 
 
 # ---------------------------
@@ -200,22 +223,17 @@ def award_points_bulk(
 
 @router.delete("/transactions/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
-    transaction = db.query(PointTransaction).filter(PointTransaction.id == transaction_id).first()
-    if not transaction:
+    # Set-based, so the row's admin notification goes with it
+    if not delete_transactions(db, PointTransaction.id == transaction_id):
         raise HTTPException(status_code=404, detail="Transaction not found")
-
-    student_id = transaction.student_id
-    db.delete(transaction)
     db.commit()
-    recalculate_student_totals(db, student_id)
     return {"ok": True}
 
 
 @router.delete("/transactions/student/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_all_transactions_for_student(student_id: int, db: Session = Depends(get_db)):
-    db.query(PointTransaction).filter(PointTransaction.student_id == student_id).delete(synchronize_session="fetch")
+    delete_transactions(db, PointTransaction.student_id == student_id)
     db.commit()
-    recalculate_student_totals(db, student_id)
     return {"ok": True}
 
 
@@ -277,10 +295,9 @@ def delete_event(event_id: int, db: Session = Depends(get_db)):
     if not db_event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    transactions = db.query(PointTransaction).filter(PointTransaction.event_id == event_id).all()
-    for t in transactions:
-        db.delete(t)
-        recalculate_student_totals(db, t.student_id)
+    # Bulk-delete the event's ledger rows and notifications, then adjust
+    # every affected student's totals in one batch, all in one transaction
+    delete_transactions(db, PointTransaction.event_id == event_id)
 
     db.delete(db_event)
     db.commit()
@@ -296,34 +313,131 @@ def get_unread_count(
     db: Session = Depends(get_db),
     admin_user: User = Depends(get_current_admin_user)
 ):
-    count = db.query(AdminNotificationStatus).filter(AdminNotificationStatus.seen == False).count()
-    return {"unread_count": count}
+    return {"unread_count": unread_count(db)}
 
 
 @router.patch("/notifications/mark_seen", status_code=status.HTTP_200_OK)
 def mark_notifications_seen(
+    up_to_id: Optional[int] = Query(None, description="Newest transaction id the admin has seen"),
     db: Session = Depends(get_db),
     admin_user: User = Depends(get_current_admin_user)
 ):
-    unseen_notifications = db.query(AdminNotificationStatus).filter(AdminNotificationStatus.seen == False).all()
-    for n in unseen_notifications:
-        n.seen = True
+    marked = mark_seen(db, up_to_id)
     db.commit()
-    return {"message": "All notifications marked as seen"}
+    return {"message": "All notifications marked as seen", "marked": marked}
+
+
+def _feed_rows(db: Session, after_id: Optional[int], limit: int):
+    """Participations after `after_id` (or the latest ones), newest first."""
+    query = (
+        db.query(PointTransaction.id, PointTransaction.created_at, Student.name, Event.title, AdminNotificationStatus.seen)
+        .join(Student, PointTransaction.student_id == Student.id)
+        .join(Event, PointTransaction.event_id == Event.id)
+        .join(AdminNotificationStatus, AdminNotificationStatus.point_transaction_id == PointTransaction.id)
+        .filter(PointTransaction.kind == TransactionKind.PARTICIPATION)
+    )
+    if after_id is None:
+        rows = query.order_by(desc(PointTransaction.id)).limit(limit).all()
+    else:
+        rows = query.filter(PointTransaction.id > after_id).order_by(PointTransaction.id).limit(limit).all()[::-1]
+    return [
+        {
+            "id": r.id,
+            "student_name": r.name,
+            "event_title": r.title,
+            "timestamp": str(r.created_at),
+            "seen": bool(r.seen),
+        }
+        for r in rows
+    ]
+
 
+def _feed_page(db: Session, after_id: Optional[int], limit: int):
+    entries = _feed_rows(db, after_id, limit)
+    return {
+        "entries": entries,
+        "next_after_id": entries[0]["id"] if entries else after_id,
+        "unread_count": unread_count(db),
+    }
 
-@router.get("/{event_id}/participants")
-def get_event_participants(event_id: int, db: Session = Depends(get_db)):
-    print("Participants route accessed")
 
-    participants = (
-        db.query(Student)
-        .join(PointTransaction, PointTransaction.student_id == Student.id)
+@router.get("/notifications/feed", response_model=schemas.NotificationFeed)
+async def get_notification_feed(
+    after_id: Optional[int] = Query(None, description="Newest transaction id the client already has"),
+    wait: float = Query(25, ge=0, le=60, description="Seconds to hold the request when nothing is new"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user),
+):
+    """
+    Long-poll feed of participations. Returns at once when there are rows
+    after `after_id` (or when no cursor is given), otherwise waits up to
+    `wait` seconds for a new participation before answering.
+
+    Only participations committed through this worker end the wait early;
+    ones from other workers show up on the query made when it times out.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        # Taken before the query, so a commit landing after it still wakes us
+        generation = notification_feed.generation
+        page = await run_in_threadpool(_feed_page, db, after_id, limit)
+        remaining = deadline - time.monotonic()
+        if page["entries"] or after_id is None or remaining <= 0:
+            return page
+
+        # Hand the connection back to the pool while the request is idle.
+        # A wake-up can find nothing new (the row was deleted, or is not
+        # after the cursor); then the wait goes on for the time left.
+        db.close()
+        await notification_feed.wait(generation, remaining)
+
+
+def _participation_filter(event_id: int):
+    return (
+        PointTransaction.event_id == event_id,
+        PointTransaction.kind == TransactionKind.PARTICIPATION,
+    )
+
+
+def _participant_count(db: Session, event_id: int) -> int:
+    return (
+        db.query(func.count(distinct(PointTransaction.student_id)))
+        .filter(*_participation_filter(event_id))
+        .scalar()
+    )
+
+
+@router.get("/{event_id}/participants", response_model=schemas.ParticipantPage)
+def get_event_participants(
+    event_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[int] = Query(None, description="Last student id of the previous page"),
+    db: Session = Depends(get_db),
+):
+    # Each student once, in id order, resuming after the cursor (keyset)
+    query = (
+        db.query(Student.id, Student.name)
         .filter(
-            PointTransaction.event_id == event_id,
-            PointTransaction.reason == "Student opted to participate"
+            exists().where(
+                PointTransaction.student_id == Student.id,
+                *_participation_filter(event_id),
+            )
         )
-        .all()
+        .order_by(Student.id)
     )
+    if cursor is not None:
+        query = query.filter(Student.id > cursor)
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return {
+        "participants": [{"id": r.id, "name": r.name} for r in rows[:limit]],
+        "total": _participant_count(db, event_id),
+        "next_cursor": next_cursor,
+    }
+
 
-    return [{"id": s.id, "name": s.name} for s in participants]
+@router.get("/{event_id}/participants/count", response_model=schemas.ParticipantCount)
+def get_event_participant_count(event_id: int, db: Session = Depends(get_db)):
+    return {"event_id": event_id, "count": _participant_count(db, event_id)}
@@ -1,149 +1,194 @@
 # routers/leaderboard.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import Optional
 
 from app.database import get_db
-from app.models.student import Student
-from app.models.student_total import StudentTotal
+from app.dependencies import get_current_admin_user
 from app.models.department import Department
-from app.models.point_transaction import PointTransaction
-from app.schemas import StudentResponse, StudentTotalResponse
+from app.models.student import Student
+from app.models.user import User
+from app.schemas import (
+    DepartmentLeaderboard,
+    LeaderboardPage,
+    SimulationRequest,
+    SimulationResponse,
+    StudentStanding,
+)
+from app.services.daily_buckets import resolve_window
+from app.services.leaderboard_cache import TOP_K_MAX, cached_response, top_k_cache
+from app.services.leaderboard_index import leaderboard_index
+from app.services.leaderboard_service import (
+    DEPARTMENT_RANKINGS,
+    get_department_rankings,
+    get_leaderboard_page,
+    get_student_standing,
+    get_window_page,
+)
+from app.services.scoring_engine import POINT_CATEGORIES, get_weights, merge_weights
+from app.services.scoring_versions import check_totals_generation
+from app.services.simulation import simulate_awards
+
+def _sync_shared_totals(db: Session = Depends(get_db)):
+    # Totals rebuilt or imported by another process (e.g. the CLI)
+    check_totals_generation(db)
 
 router = APIRouter(
     prefix="/leaderboard",
-    tags=["Leaderboard"]
+    tags=["Leaderboard"],
+    dependencies=[Depends(_sync_shared_totals)],
 )
 
-def attach_wins(db: Session, students: List[Student]):
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+def _cached(request: Request, key: tuple, render) -> Response:
     """
-    Compute wins for each student and attach to the student's total object.
-    Wins are the number of point_transactions with reason='winner'.
+    A rendered board as cached JSON with an ETag; clients that send the
+    current ETag back in If-None-Match get an empty 304.
     """
-    student_ids = [s.id for s in students]
-    if not student_ids:
-        return
-
-    # Query wins per student
-    wins_subq = (
-        db.query(
-            PointTransaction.student_id,
-            func.count(PointTransaction.id).label("wins")
-        )
-        .filter(PointTransaction.student_id.in_(student_ids))
-        .filter(PointTransaction.reason == "winner")
-        .group_by(PointTransaction.student_id)
-        .all()
-    )
-    wins_dict = {student_id: wins for student_id, wins in wins_subq}
+    return _respond(request, *cached_response(key, render))
+
+def _respond(request: Request, etag: str, body) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body(), media_type="application/json", headers=headers)
 
-    for s in students:
-        if s.total:
-            s.total.wins = wins_dict.get(s.id, 0)
+def _page(request: Request, db: Session, cursor: Optional[str], limit: int, **scope) -> Response:
+    def render() -> bytes:
+        try:
+            page = get_leaderboard_page(db, cursor=cursor, limit=limit, **scope)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return page.model_dump_json().encode()
+
+    board = next(iter(scope), "college")
+    return _cached(request, (board, scope.get(board), cursor, limit), render)
 
 # --------------------------- College Leaderboard ---------------------------
-@router.get("/", response_model=List[StudentResponse])
-def get_college_leaderboard(db: Session = Depends(get_db)):
-    students = (
-        db.query(Student)
-        .join(StudentTotal, Student.id == StudentTotal.student_id)
-        .order_by(
-            StudentTotal.composite_points.desc(),
-            StudentTotal.academics_points.desc(),
-            # Wins handled dynamically below
-            StudentTotal.technical_points.desc(),
-            Student.created_at.asc()
-        )
-        .options(
-            joinedload(Student.department),
-            joinedload(Student.total),
-            joinedload(Student.point_transactions)
-        )
-        .all()
-    )
+@router.get("/", response_model=LeaderboardPage)
+def get_college_leaderboard(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    window: Optional[str] = Query(None, description="7d, 30d or custom (with start / end); all-time if omitted"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    top: Optional[int] = Query(None, ge=1, le=TOP_K_MAX, description="Only the first `top` students"),
+    db: Session = Depends(get_db),
+):
+    if top is not None:
+        if cursor is not None or window is not None or start is not None or end is not None:
+            raise HTTPException(status_code=400, detail="top cannot be combined with cursor or window")
+        if leaderboard_index.enabled:
+            return _respond(request, *top_k_cache.response(db, top))
+        # Several workers: ORDER BY ... LIMIT top on the ranking index
+        return _page(request, db, None, top)
 
-    attach_wins(db, students)
-    # Re-sort using wins dynamically for tie-breaker
-    students.sort(
-        key=lambda s: (
-            -(s.total.composite_points if s.total else 0),
-            -(s.total.academics_points if s.total else 0),
-            -(s.total.wins if s.total else 0),
-            -(s.total.technical_points if s.total else 0),
-            s.created_at
-        )
-    )
+    if window is None:
+        if start is not None or end is not None:
+            raise HTTPException(status_code=400, detail="start and end need window=custom")
+        return _page(request, db, cursor, limit)
+
+    try:
+        first, last = resolve_window(window, start, end)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    def render() -> bytes:
+        try:
+            page = get_window_page(db, first, last, cursor=cursor, limit=limit)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return page.model_dump_json().encode()
 
-    return students
+    # Keyed by the resolved days, so "7d" moves on by itself at midnight UTC
+    return _cached(request, ("window", (first, last), cursor, limit), render)
 
 # --------------------------- Department Leaderboard ---------------------------
-@router.get("/department/{department_id}", response_model=List[StudentResponse])
-def get_department_leaderboard(department_id: int, db: Session = Depends(get_db)):
-    if not db.query(Department).filter(Department.id == department_id).first():
+@router.get("/department/{department_id}", response_model=LeaderboardPage)
+def get_department_leaderboard(
+    department_id: int,
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    leaderboard_index.ensure_loaded(db)
+    if leaderboard_index.ready:
+        exists = leaderboard_index.has_department(department_id)
+    else:
+        exists = db.query(Department.id).filter(Department.id == department_id).first() is not None
+    if not exists:
         raise HTTPException(status_code=404, detail="Department not found")
 
-    students = (
-        db.query(Student)
-        .join(StudentTotal, Student.id == StudentTotal.student_id)
-        .filter(Student.department_id == department_id)
-        .order_by(
-            StudentTotal.composite_points.desc(),
-            StudentTotal.academics_points.desc(),
-            StudentTotal.technical_points.desc(),
-            Student.created_at.asc()
-        )
-        .options(
-            joinedload(Student.department),
-            joinedload(Student.total),
-            joinedload(Student.point_transactions)
-        )
-        .all()
-    )
+    return _page(request, db, cursor, limit, department_id=department_id)
 
-    attach_wins(db, students)
-    students.sort(
-        key=lambda s: (
-            -(s.total.composite_points if s.total else 0),
-            -(s.total.academics_points if s.total else 0),
-            -(s.total.wins if s.total else 0),
-            -(s.total.technical_points if s.total else 0),
-            s.created_at
-        )
+# --------------------------- Department Cup ---------------------------
+@router.get("/departments", response_model=DepartmentLeaderboard)
+def get_department_cup(
+    request: Request,
+    by: str = Query("average", description="Rank by the 'average' or 'total' composite"),
+    db: Session = Depends(get_db),
+):
+    """Departments ranked against each other from the department_totals rollup."""
+    if by not in DEPARTMENT_RANKINGS:
+        raise HTTPException(status_code=400, detail=f"by must be one of: {', '.join(DEPARTMENT_RANKINGS)}")
+    return _cached(
+        request,
+        ("departments", by, None, None),
+        lambda: get_department_rankings(db, by=by).model_dump_json().encode(),
     )
 
-    return students
-
 # --------------------------- Class (Year) Leaderboard ---------------------------
-@router.get("/class/{year}", response_model=List[StudentResponse])
-def get_class_leaderboard(year: int, db: Session = Depends(get_db)):
-    students = (
-        db.query(Student)
-        .join(StudentTotal, Student.id == StudentTotal.student_id)
-        .filter(Student.year == year)
-        .order_by(
-            StudentTotal.composite_points.desc(),
-            StudentTotal.academics_points.desc(),
-            StudentTotal.technical_points.desc(),
-            Student.created_at.asc()
-        )
-        .options(
-            joinedload(Student.department),
-            joinedload(Student.total),
-            joinedload(Student.point_transactions)
-        )
-        .all()
-    )
+@router.get("/class/{year}", response_model=LeaderboardPage)
+def get_class_leaderboard(
+    year: int,
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    return _page(request, db, cursor, limit, year=year)
 
-    attach_wins(db, students)
-    students.sort(
-        key=lambda s: (
-            -(s.total.composite_points if s.total else 0),
-            -(s.total.academics_points if s.total else 0),
-            -(s.total.wins if s.total else 0),
-            -(s.total.technical_points if s.total else 0),
-            s.created_at
-        )
-    )
+# --------------------------- Student Rank ---------------------------
+@router.get("/rank/{student_id}", response_model=StudentStanding)
+def get_student_rank(
+    student_id: int,
+    k: int = Query(2, ge=0, le=25, description="Neighbours to return above and below"),
+    db: Session = Depends(get_db),
+):
+    standing = get_student_standing(db, student_id, k)
+    if standing is None:
+        if db.query(Student.id).filter(Student.id == student_id).first() is None:
+            raise HTTPException(status_code=404, detail="Student not found")
+        raise HTTPException(status_code=404, detail="Student is not on the leaderboard yet")
+    return standing
+
+# --------------------------- What-if Simulation ---------------------------
+@router.post("/simulate", response_model=SimulationResponse)
+def simulate_leaderboard(
+    request: SimulationRequest,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user),
+):
+    """
+    Preview how hypothetical awards and/or weight changes would move the
+    college ranking. Runs on an in-memory copy; nothing is saved.
+    """
+    for award in request.awards:
+        if award.category not in POINT_CATEGORIES:
+            raise HTTPException(status_code=400, detail=f"Invalid category: {award.category}")
+    if request.limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    try:
+        weights = merge_weights(get_weights(db), request.weights)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-    return students
+    return simulate_awards(db, request.awards, weights=weights, limit=request.limit)
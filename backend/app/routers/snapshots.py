@@ -1,6 +1,7 @@
 # routers/snapshots.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select, insert, false
 from typing import List
 from app.database import get_db
 from app.models.student import Student
@@ -9,7 +10,7 @@ from app.models.final_snapshot import FinalSnapshot
 from app.schemas import StudentResponse, FinalSnapshotResponse
 from app.dependencies import get_current_admin_user
 from app.models.user import User
-from app.routers.leaderboard import attach_wins  # reuse existing tie-breaker logic
+from app.services.leaderboard_index import ranking_order_by  # shared tie-breaker order
 
 router = APIRouter(prefix="/snapshots", tags=["Snapshots"])
 
@@ -23,51 +24,46 @@ def create_snapshot(
     Compute current leaderboard, assign ranks, and save immutable snapshot.
     Admin-only access. Snapshots start as revealed=False.
     """
-    students = (
-        db.query(Student)
-        .join(StudentTotal, Student.id == StudentTotal.student_id)
-        .order_by(
-            StudentTotal.composite_points.desc(),
-            StudentTotal.academics_points.desc(),
-            StudentTotal.technical_points.desc(),
-            Student.created_at.asc()
+    rank = func.row_number().over(order_by=ranking_order_by())
+
+    # Rank and copy in one INSERT ... SELECT, initially hidden
+    ranked = (
+        select(
+            StudentTotal.student_id,
+            StudentTotal.composite_points,
+            StudentTotal.academics_points,
+            StudentTotal.sports_points,
+            StudentTotal.cultural_points,
+            StudentTotal.technical_points,
+            StudentTotal.social_points,
+            rank,
+            false(),
         )
-        .all()
+        .join(Student, Student.id == StudentTotal.student_id)
     )
-
-    if not students:
-        raise HTTPException(status_code=404, detail="No students found for snapshot")
-
-    attach_wins(db, students)
-
-    # Sort using tie-breaker
-    students.sort(
-        key=lambda s: (
-            -(s.total.composite_points if s.total else 0),
-            -(s.total.academics_points if s.total else 0),
-            -(s.total.wins if s.total else 0),
-            -(s.total.technical_points if s.total else 0),
-            s.created_at
+    result = db.execute(
+        insert(FinalSnapshot).from_select(
+            [
+                "student_id",
+                "composite_points",
+                "academics_points",
+                "sports_points",
+                "cultural_points",
+                "technical_points",
+                "social_points",
+                "rank",
+                "revealed",
+            ],
+            ranked,
         )
     )
 
-    # Save snapshots in a single transaction, initially hidden
-    for idx, student in enumerate(students):
-        snapshot = FinalSnapshot(
-            student_id=student.id,
-            composite_points=student.total.composite_points,
-            academics_points=student.total.academics_points,
-            sports_points=student.total.sports_points,
-            cultural_points=student.total.cultural_points,
-            technical_points=student.total.technical_points,
-            social_points=student.total.social_points,
-            rank=idx + 1,
-            revealed=False  # ✅ initially hidden
-        )
-        db.add(snapshot)
+    if not result.rowcount:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="No students found for snapshot")
 
     db.commit()
-    return {"ok": True, "snapshots_created": len(students)}
+    return {"ok": True, "snapshots_created": result.rowcount}
 
 
 # --------------------------- Public GET (non-admin view, only revealed) ---------------------------
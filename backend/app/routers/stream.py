@@ -0,0 +1,67 @@
+# routers/stream.py
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.services.scoring_events import scoring_events
+
+router = APIRouter(prefix="/stream", tags=["Stream"])
+
+HEARTBEAT_SECONDS = 15
+
+def _resume_version(since: Optional[int], last_event_id: Optional[str]) -> Optional[int]:
+    # EventSource sends Last-Event-ID by itself when it reconnects
+    if since is not None:
+        return since
+    try:
+        return int(last_event_id) if last_event_id else None
+    except ValueError:
+        return None
+
+async def _event_stream(request: Request, since: Optional[int], student_id: Optional[int] = None):
+    async with scoring_events.subscribe(since) as queue:
+        # Tell the client where it starts so it can resume from here later
+        yield f"event: hello\ndata: {{\"version\":{scoring_events.version}}}\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            if student_id is not None and event.student_id not in (None, student_id):
+                continue
+            yield event.to_sse()
+
+def _sse(generator) -> StreamingResponse:
+    return StreamingResponse(
+        generator,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# --------------------------- Leaderboard Stream ---------------------------
+@router.get("/leaderboard")
+async def stream_leaderboard(
+    request: Request,
+    since: Optional[int] = Query(None, description="Resume after this version"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-sent events for every committed totals change: `totals` events
+    carry one student's new points, wins and college rank; `reset` means
+    the whole board changed and should be refetched.
+    """
+    return _sse(_event_stream(request, _resume_version(since, last_event_id)))
+
+# --------------------------- Student Stream ---------------------------
+@router.get("/students/{student_id}")
+async def stream_student(
+    student_id: int,
+    request: Request,
+    since: Optional[int] = Query(None, description="Resume after this version"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """Like /stream/leaderboard, limited to one student (plus resets)."""
+    return _sse(_event_stream(request, _resume_version(since, last_event_id), student_id))
@@ -1,5 +1,5 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import Response
 from sqlalchemy.orm import Session, joinedload
 from app.database import get_db
@@ -7,6 +7,10 @@ from app.models.student import Student
 from app.models.department import Department
 from app.models.point_transaction import PointTransaction
 from app.models.student_total import StudentTotal
+from app.services.department_rollup import refresh_department_totals
+from app.services.leaderboard_index import leaderboard_index
+from app.services.rank_history import get_rank_history
+from app.services.scoring_events import scoring_events
 from app import schemas
 
 router = APIRouter(prefix="/students", tags=["Students"])
@@ -72,6 +76,7 @@ def create_student(student: schemas.StudentCreate, db: Session = Depends(get_db)
     db.add(new_student)
     db.commit()
     db.refresh(new_student)
+    leaderboard_index.set_student(new_student)
     return new_student
 
 # ------------------------------------------------------------
@@ -87,13 +92,20 @@ def update_student(student_id: int, student: schemas.StudentCreate, db: Session
     if not department:
         raise HTTPException(status_code=404, detail="Department not found")
 
+    previous_department_id = db_student.department_id
     db_student.name = student.name
     db_student.student_id = student.student_id
     db_student.year = student.year
     db_student.department_id = student.department_id
 
+    if previous_department_id != student.department_id:
+        # Their totals move from one department rollup to the other
+        db.flush()
+        refresh_department_totals(db, [previous_department_id, student.department_id])
     db.commit()
     db.refresh(db_student)
+    leaderboard_index.set_student(db_student)
+    scoring_events.publish_reset("students")
     return db_student
 
 # ------------------------------------------------------------
@@ -105,8 +117,13 @@ def delete_student(student_id: int, db: Session = Depends(get_db)):
     if not db_student:
         raise HTTPException(status_code=404, detail="Student not found")
 
+    department_id = db_student.department_id
     db.delete(db_student)
+    db.flush()
+    refresh_department_totals(db, [department_id])
     db.commit()
+    leaderboard_index.remove_student(student_id)
+    scoring_events.publish_reset("student_removed")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # ------------------------------------------------------------
@@ -125,6 +142,25 @@ def get_student_timeline(student_id: int, db: Session = Depends(get_db)):
     )
     return transactions
 
+# ------------------------------------------------------------
+#  RANK HISTORY
+# ------------------------------------------------------------
+@router.get("/{student_id}/rank_history", response_model=schemas.RankHistory)
+def get_student_rank_history(
+    student_id: int,
+    days: int = Query(365, ge=1, le=730),
+    max_points: int = Query(60, ge=2, le=400),
+    db: Session = Depends(get_db),
+):
+    if not db.query(Student.id).filter(Student.id == student_id).first():
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    points = get_rank_history(db, student_id, days=days, max_points=max_points)
+    return schemas.RankHistory(
+        student_id=student_id,
+        points=[schemas.RankHistoryPoint.model_validate(point) for point in points],
+    )
+
 # ------------------------------------------------------------
 #  POINTS BREAKDOWN
 # ------------------------------------------------------------
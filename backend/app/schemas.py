@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, Literal
 from pydantic import BaseModel, ConfigDict
 
@@ -25,7 +25,7 @@ class StudentTotalResponse(BaseModel):
     technical_points: int
     social_points: int
     composite_points: int
-    wins: Optional[int] = 0  # ✅ Add dynamic wins field
+    wins: Optional[int] = 0  # ✅ maintained by the scoring service
     model_config = Config
 
 # -------------------- Event Schemas --------------------
@@ -78,6 +78,105 @@ class StudentResponse(BaseModel):
     point_transactions: list[PointTransactionResponse] = []
     model_config = Config
 
+class RankHistoryPoint(BaseModel):
+    day: date
+    rank: int              # college rank at the end of that day
+    composite_points: int
+    model_config = Config
+
+class RankHistory(BaseModel):
+    student_id: int
+    points: list[RankHistoryPoint] = []  # oldest first, downsampled
+
+# -------------------- Leaderboard Schemas --------------------
+class LeaderboardEntry(BaseModel):
+    rank: int
+    id: int
+    name: str
+    department: Optional[str] = None  # department name
+    academics_points: int
+    sports_points: int
+    cultural_points: int
+    technical_points: int
+    social_points: int
+    composite_points: int
+    wins: int = 0
+    model_config = Config
+
+class LeaderboardPage(BaseModel):
+    entries: list[LeaderboardEntry] = []
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+    window_start: Optional[date] = None  # set on time-windowed boards (UTC days, inclusive)
+    window_end: Optional[date] = None
+
+class BoardPosition(BaseModel):
+    rank: int
+    size: int  # students ranked on that board
+
+class StudentStanding(BaseModel):
+    student: LeaderboardEntry          # rank = college rank
+    college: BoardPosition
+    department: BoardPosition
+    year: BoardPosition
+    percentile: float                  # % of the college ranked below
+    above: list[LeaderboardEntry] = [] # board order, nearest last
+    below: list[LeaderboardEntry] = [] # board order, nearest first
+
+class DepartmentStanding(BaseModel):
+    rank: int                          # shared by departments tied on the ranking value
+    department_id: int
+    name: str
+    student_count: int                 # students on the leaderboard
+    average_composite: float
+    academics_points: int
+    sports_points: int
+    cultural_points: int
+    technical_points: int
+    social_points: int
+    composite_points: int
+    wins: int = 0
+
+class DepartmentLeaderboard(BaseModel):
+    by: str                            # "average" or "total" composite
+    entries: list[DepartmentStanding] = []
+
+# -------------------- Scoring Weight Schemas --------------------
+class ScoringWeightBase(BaseModel):
+    category: str
+    weight: float = 1.0
+    cap: Optional[int] = None  # max points counted from this category
+
+class ScoringWeightResponse(ScoringWeightBase):
+    model_config = Config
+
+# -------------------- Simulation Schemas --------------------
+class SimulatedAward(BaseModel):
+    student_id: int
+    category: str
+    points: int
+    is_win: bool = False
+
+class SimulationRequest(BaseModel):
+    awards: list[SimulatedAward] = []
+    weights: list[ScoringWeightBase] = []  # overrides; unlisted categories keep current weights
+    limit: int = 100                       # max rank changes returned
+
+class RankDelta(BaseModel):
+    student_id: int
+    name: Optional[str] = None
+    old_rank: Optional[int] = None  # None when the student was not ranked yet
+    new_rank: int
+    rank_change: int                # positive = moves up
+    old_composite: int
+    new_composite: int
+
+class SimulationResponse(BaseModel):
+    cohort_size: int
+    changed: int                    # students whose rank would change
+    deltas: list[RankDelta] = []
+    unknown_students: list[int] = []
+    elapsed_ms: float
+
 # -------------------- Additional Payloads --------------------
 class PointAward(BaseModel):
     student_id: int
@@ -135,14 +234,41 @@ class AchievementResponse(BaseModel):
 
 # -------------------- Participation Logs (Admin) --------------------
 class ParticipationLog(BaseModel):
+    id: int  # point transaction id; pass the newest as mark_seen's up_to_id
     student_name: str
     event_title: str
     timestamp: str
 
     model_config = Config
 
+class NotificationFeedEntry(BaseModel):
+    id: int
+    student_name: Optional[str] = None
+    event_title: str
+    timestamp: str
+    seen: bool
+
+class NotificationFeed(BaseModel):
+    entries: list[NotificationFeedEntry]   # newest first
+    next_after_id: Optional[int] = None    # pass back as after_id
+    unread_count: int
+
 # -------------------- Participation Request (Student) --------------------
 class ParticipationRequest(BaseModel):
     student_id: int
     event_id: int
     model_config = Config
+
+# -------------------- Event Participants --------------------
+class Participant(BaseModel):
+    id: int
+    name: Optional[str] = None
+
+class ParticipantPage(BaseModel):
+    participants: list[Participant]
+    total: int
+    next_cursor: Optional[int] = None  # pass as ?cursor= for the next page
+
+class ParticipantCount(BaseModel):
+    event_id: int
+    count: int
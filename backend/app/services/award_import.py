@@ -0,0 +1,164 @@
+# app/services/award_import.py
+import csv
+import json
+import logging
+import re
+from typing import Callable, Dict, IO, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.event import Event
+from app.models.point_transaction import PointTransaction, TransactionKind, kind_for_reason
+from app.models.student import Student
+from app.services.scoring_engine import POINT_CATEGORIES
+from app.services.scoring_service import apply_point_deltas
+from app.services.scoring_versions import mark_totals_changed
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "jsonl")
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+_INTEGER = re.compile(r"[+-]?[0-9]+")
+
+
+# --------------------------- Parsing ---------------------------
+def _records(stream: IO[str], fmt: str) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (line number, record) one row at a time. A record is a dict, or
+    an error string for a line that could not be parsed at all.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield line_no, f"Invalid JSON: {exc.msg}"
+                continue
+            yield line_no, record if isinstance(record, dict) else "Expected a JSON object"
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _integer(value) -> int:
+    """
+    An int from a JSON integer or a string of digits (CSV cells, quoted
+    JSON). Floats such as 2.7, booleans and anything else raise ValueError
+    rather than being truncated or coerced.
+    """
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and _INTEGER.fullmatch(value.strip()):
+        return int(value)
+    raise ValueError(value)
+
+
+def _parse(record: dict, students: set, events: set) -> dict:
+    """One award row as PointTransaction values. Raises ValueError when invalid."""
+    try:
+        student_id = _integer(record["student_id"])
+        event_id = _integer(record["event_id"])
+        points = _integer(record["points"])
+    except KeyError as exc:
+        raise ValueError(f"Missing field: {exc.args[0]}")
+    except ValueError:
+        raise ValueError("student_id, event_id and points must be integers")
+
+    category = (record.get("category") or "").strip()
+    if category not in POINT_CATEGORIES:
+        raise ValueError(f"Invalid category: {category or '(empty)'}")
+    if student_id not in students:
+        raise ValueError(f"Student not found: {student_id}")
+    if event_id not in events:
+        raise ValueError(f"Event not found: {event_id}")
+
+    reason = record.get("reason") or None
+    return {
+        "student_id": student_id,
+        "event_id": event_id,
+        "points": points,
+        "category": category,
+        "reason": reason,
+        "kind": kind_for_reason(reason),
+    }
+
+
+# --------------------------- Import ---------------------------
+def _write_chunk(db: Session, rows: List[dict]):
+    """
+    Insert one chunk of ledger rows, add it to the totals and commit. The
+    shared totals generation is bumped with it, so servers other than the
+    importing process (e.g. a CLI import) reload their leaderboards.
+    """
+    db.execute(insert(PointTransaction), rows)
+    apply_point_deltas(
+        db,
+        [(r["student_id"], r["category"], r["points"], r["kind"] == TransactionKind.WINNER) for r in rows],
+    )
+    mark_totals_changed(db)
+    db.commit()
+
+
+def import_awards(
+    db: Session,
+    stream: IO[str],
+    fmt: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """
+    Stream award rows (student_id, event_id, points, category, reason) from
+    a CSV or JSONL text stream into point_transactions.
+
+    Student and event IDs are checked against ID sets loaded once up front.
+    Valid rows are inserted `chunk_size` at a time; each chunk updates the
+    totals once and commits on its own, so only one chunk is ever held in
+    memory and a failure loses at most the chunk in flight. Invalid rows are
+    skipped and reported with their line number.
+
+    `progress` is called with the running counts after every chunk.
+    """
+    students = {sid for (sid,) in db.query(Student.id)}
+    events = {eid for (eid,) in db.query(Event.id)}
+
+    stats = {"rows": 0, "imported": 0, "failed": 0, "chunks": 0}
+    errors: List[Dict] = []
+    chunk: List[dict] = []
+
+    def _flush():
+        _write_chunk(db, chunk)
+        stats["imported"] += len(chunk)
+        stats["chunks"] += 1
+        chunk.clear()
+        logger.info("award import: %(imported)d imported, %(failed)d failed", stats)
+        if progress:
+            progress(dict(stats))
+
+    for line_no, record in _records(stream, fmt):
+        stats["rows"] += 1
+        try:
+            if isinstance(record, str):
+                raise ValueError(record)
+            chunk.append(_parse(record, students, events))
+        except ValueError as exc:
+            stats["failed"] += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_no, "error": str(exc)})
+            continue
+        if len(chunk) >= chunk_size:
+            _flush()
+
+    if chunk:
+        _flush()
+
+    return {**stats, "errors": errors, "errors_truncated": stats["failed"] > len(errors)}
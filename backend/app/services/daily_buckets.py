@@ -0,0 +1,195 @@
+# app/services/daily_buckets.py
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, case, cast, delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.point_transaction import PointTransaction, TransactionKind
+from app.models.student_daily_points import StudentDailyPoints
+from app.services.leaderboard_index import TOTAL_FIELDS
+from app.services.scoring_engine import POINT_CATEGORIES, Weights, composite_sql
+
+# Named windows, in days ending today (UTC)
+WINDOWS = {"7d": 7, "30d": 30}
+# Longest custom window: bounds the buckets summed per student
+MAX_WINDOW_DAYS = 92
+
+BucketKey = Tuple[int, Optional[date], str]
+
+
+def utc_day(value) -> Optional[date]:
+    """UTC calendar day of a ledger timestamp (naive ones are taken as UTC)."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _utc_day_sql(expr):
+    return cast(func.timezone("UTC", expr), Date)
+
+
+# --------------------------- Maintenance ---------------------------
+def apply_bucket_deltas(db: Session, deltas: Dict[BucketKey, List[int]]):
+    """
+    Add {(student_id, day, category): [points, wins]} to the daily buckets
+    with one multi-row upsert. A day of None means the day of the current
+    transaction, matching the created_at default of the ledger rows it
+    was inserted with. Does not commit.
+    """
+    rows = [
+        {
+            "student_id": student_id,
+            "day": day if day is not None else _utc_day_sql(func.now()),
+            "category": category,
+            "points": points,
+            "wins": wins,
+        }
+        for (student_id, day, category), (points, wins) in sorted(
+            deltas.items(), key=lambda item: (item[0][0], str(item[0][1]), item[0][2])
+        )
+        if points or wins
+    ]
+    if not rows:
+        return
+
+    table = StudentDailyPoints.__table__
+    stmt = insert(table).values(rows)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.student_id, table.c.day, table.c.category],
+            set_={
+                "points": table.c.points + stmt.excluded.points,
+                "wins": table.c.wins + stmt.excluded.wins,
+            },
+        )
+    )
+
+
+def _ledger_buckets_select():
+    pt = PointTransaction.__table__
+    day = _utc_day_sql(pt.c.created_at)
+    points = func.coalesce(func.sum(pt.c.points), 0)
+    wins = func.sum(case((pt.c.kind == TransactionKind.WINNER, 1), else_=0))
+    return (
+        select(pt.c.student_id, day, pt.c.category, points, wins)
+        .where(pt.c.student_id.isnot(None), pt.c.category.isnot(None))
+        .group_by(pt.c.student_id, day, pt.c.category)
+        # Participation rows carry no points; they need no bucket
+        .having(or_(points != 0, wins != 0))
+    )
+
+
+def rebuild_buckets(
+    db: Session,
+    student_ids: Optional[Iterable[int]] = None,
+    id_range: Optional[Tuple[int, int]] = None,
+) -> int:
+    """
+    Replace the buckets of the given students (or of an inclusive
+    student-id range) with ones grouped from the ledger by UTC day and
+    category. Does not commit. Returns the number of buckets written.
+    """
+    pt = PointTransaction.__table__
+    table = StudentDailyPoints.__table__
+    if student_ids is not None:
+        student_ids = list(student_ids)
+        ledger_scope = pt.c.student_id.in_(student_ids)
+        bucket_scope = table.c.student_id.in_(student_ids)
+    else:
+        ledger_scope = pt.c.student_id.between(*id_range)
+        bucket_scope = table.c.student_id.between(*id_range)
+
+    db.execute(delete(table).where(bucket_scope).execution_options(synchronize_session=False))
+    stmt = insert(table).from_select(
+        ["student_id", "day", "category", "points", "wins"],
+        _ledger_buckets_select().where(ledger_scope),
+    )
+    # An award committed meanwhile may already have recreated a bucket
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.student_id, table.c.day, table.c.category],
+        set_={"points": stmt.excluded.points, "wins": stmt.excluded.wins},
+    )
+    return db.execute(stmt).rowcount
+
+
+def backfill_buckets(db: Session, chunk_size: int = 1000) -> Dict[str, int]:
+    """
+    Build every daily bucket from point_transactions, one student-id range
+    of `chunk_size` at a time, committing after each so a large ledger is
+    never held in one transaction. Safe to re-run: each range is replaced.
+    """
+    pt = PointTransaction.__table__
+    table = StudentDailyPoints.__table__
+    bounds = [
+        db.execute(select(func.min(pt.c.student_id), func.max(pt.c.student_id))).one(),
+        db.execute(select(func.min(table.c.student_id), func.max(table.c.student_id))).one(),
+    ]
+    lows = [low for low, _ in bounds if low is not None]
+    if not lows:
+        return {"ranges": 0, "buckets": 0}
+    low, high = min(lows), max(high for _, high in bounds if high is not None)
+
+    ranges = buckets = 0
+    for start in range(low, high + 1, chunk_size):
+        buckets += rebuild_buckets(db, id_range=(start, min(start + chunk_size - 1, high)))
+        db.commit()
+        ranges += 1
+    return {"ranges": ranges, "buckets": buckets}
+
+
+# --------------------------- Windows ---------------------------
+def resolve_window(
+    window: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    today: Optional[date] = None,
+) -> Tuple[date, date]:
+    """
+    Inclusive (first day, last day) of a named window ("7d", "30d": the
+    last N days including today) or of a custom start / end (end defaults
+    to today). Raises ValueError on anything else or on a custom window
+    longer than MAX_WINDOW_DAYS.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    if window in WINDOWS:
+        if start is not None or end is not None:
+            raise ValueError("start and end are only used with window=custom")
+        return today - timedelta(days=WINDOWS[window] - 1), today
+    if window != "custom":
+        raise ValueError(f"window must be one of: {', '.join([*WINDOWS, 'custom'])}")
+
+    if start is None:
+        raise ValueError("window=custom needs a start date")
+    end = end or today
+    if end < start:
+        raise ValueError("end must not be before start")
+    if (end - start).days + 1 > MAX_WINDOW_DAYS:
+        raise ValueError(f"Custom windows are limited to {MAX_WINDOW_DAYS} days")
+    return start, end
+
+
+def window_totals_select(start: date, end: date, weights: Weights):
+    """
+    Per-student totals over the buckets of days start..end, one column per
+    TOTAL_FIELDS entry, composite computed with `weights`. Reads at most
+    (days x categories) buckets per student.
+    """
+    table = StudentDailyPoints.__table__
+    category_sums = {
+        category: func.coalesce(func.sum(case((table.c.category == category, table.c.points))), 0)
+        for category in POINT_CATEGORIES
+    }
+    columns = {
+        **{f"{category}_points": value for category, value in category_sums.items()},
+        "composite_points": composite_sql(category_sums, weights),
+        "wins": func.coalesce(func.sum(table.c.wins), 0),
+    }
+    return (
+        select(table.c.student_id, *[columns[field].label(field) for field in TOTAL_FIELDS])
+        .where(table.c.day.between(start, end))
+        .group_by(table.c.student_id)
+    )
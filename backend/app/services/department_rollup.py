@@ -0,0 +1,99 @@
+# app/services/department_rollup.py
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.department_total import DepartmentTotal
+from app.models.student import Student
+from app.models.student_total import StudentTotal
+from app.services.leaderboard_index import TOTAL_FIELDS
+
+# Columns of department_totals that hold sums over student_totals
+ROLLUP_FIELDS = TOTAL_FIELDS + ["student_count"]
+
+
+def empty_delta() -> Dict[str, int]:
+    return {field: 0 for field in ROLLUP_FIELDS}
+
+
+def add_student_change(
+    delta: Dict[str, int],
+    new: Dict[str, int],
+    old: Optional[Dict[str, int]],
+    inserted: bool = False,
+):
+    """
+    Add one student's move from `old` totals (None: counted as zeros) to
+    `new` into a department's delta. A freshly inserted totals row also
+    adds the student to student_count.
+    """
+    for field in TOTAL_FIELDS:
+        delta[field] += new[field] - (old[field] if old else 0)
+    if inserted:
+        delta["student_count"] += 1
+
+
+def apply_department_deltas(db: Session, deltas: Dict[int, Dict[str, int]]):
+    """
+    Add {department_id: {field: delta}} to department_totals with one
+    multi-row INSERT ... ON CONFLICT DO UPDATE SET col = col + delta, in
+    department order so concurrent batches lock rows the same way.
+    Does not commit.
+    """
+    rows = [
+        {"department_id": department_id, **{field: delta.get(field, 0) for field in ROLLUP_FIELDS}}
+        for department_id, delta in sorted(deltas.items())
+        if any(delta.values())
+    ]
+    if not rows:
+        return
+
+    table = DepartmentTotal.__table__
+    stmt = pg_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.department_id],
+        set_={
+            **{field: table.c[field] + stmt.excluded[field] for field in ROLLUP_FIELDS},
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+
+
+def refresh_department_totals(db: Session, department_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute department rows from student_totals with one grouped
+    INSERT ... SELECT, for the given departments or all of them. Used
+    where students change hands in bulk (a student moving department,
+    new weights, a full rebuild) rather than on every award.
+    Does not commit. Returns the number of rows written.
+    """
+    table = DepartmentTotal.__table__
+    st = StudentTotal.__table__
+    students = Student.__table__
+
+    scope = []
+    if department_ids is not None:
+        department_ids = [d for d in set(department_ids) if d is not None]
+        if not department_ids:
+            return 0
+        scope = [students.c.department_id.in_(department_ids)]
+
+    db.execute(
+        delete(table)
+        .where(*([table.c.department_id.in_(department_ids)] if scope else []))
+        .execution_options(synchronize_session=False)
+    )
+    rollup = (
+        select(
+            students.c.department_id,
+            *[func.coalesce(func.sum(st.c[field]), 0) for field in TOTAL_FIELDS],
+            func.count(),
+        )
+        .select_from(st.join(students, students.c.id == st.c.student_id))
+        .where(students.c.department_id.isnot(None), *scope)
+        .group_by(students.c.department_id)
+    )
+    return db.execute(insert(table).from_select(["department_id", *ROLLUP_FIELDS], rollup)).rowcount
@@ -0,0 +1,204 @@
+# app/services/leaderboard_cache.py
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.services.leaderboard_index import TOTAL_FIELDS, RankedStudent, leaderboard_index
+from app.services.leaderboard_service import build_page, get_top_rows
+from app.services.scoring_events import ScoringEvent, scoring_events
+
+# Largest ?top= served from the in-process top-K list
+TOP_K_MAX = 100
+
+# Distinguishes this process's versions from another worker's (or a restart's)
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class ResponseCache:
+    """
+    Serialized responses keyed by request, valid for one scoring version.
+    The first lookup after the version moves drops everything; beyond that
+    the least recently used entries are evicted past `max_entries`.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+
+    def get(self, key: Hashable, version: int) -> Optional[bytes]:
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+                return None
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: Hashable, version: int, body: bytes):
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# College pages are few and hot; department / year variants are many
+college_cache = ResponseCache(max_entries=64)
+scoped_cache = ResponseCache(max_entries=512)
+
+
+def _content_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def cached_response(key: Tuple, render: Callable[[], bytes]) -> Tuple[str, Callable[[], bytes]]:
+    """
+    Return (etag, body getter) for a leaderboard response.
+
+    With the in-memory index enabled, every committed change in this
+    process bumps the scoring version, so the ETag is known before any
+    work is done and bodies are cached per version. With it disabled
+    (several workers) versions are not shared, so the body is always
+    rendered and the ETag is a hash of it.
+    """
+    if not leaderboard_index.enabled:
+        body = render()
+        return _content_etag(body), lambda: body
+
+    version = scoring_events.version
+    etag = f'"{_BOOT_ID}-{version}-{hashlib.sha1(repr(key).encode()).hexdigest()[:16]}"'
+    cache = college_cache if key[0] == "college" else scoped_cache
+
+    def body() -> bytes:
+        cached = cache.get(key, version)
+        if cached is None:
+            cached = render()
+            cache.put(key, version, cached)
+        return cached
+
+    return etag, body
+
+
+# --------------------------- Top-K ---------------------------
+class TopKCache:
+    """
+    The first `size` rows of the college board, filled with one
+    ORDER BY ... LIMIT query and then kept current from scoring events.
+
+    Unlike the versioned caches above, it only changes when an update can
+    touch it: a member's totals changed, or an outsider's new score reaches
+    the current k-th. Everything else (the long tail) leaves the list and
+    its serialized responses alone. A member dropping past the k-th, or a
+    reset, empties it and the next read refills it from the database.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._lock = threading.Lock()
+        self._rows: Optional[List[RankedStudent]] = None
+        self._bodies: Dict[int, bytes] = {}
+        self.generation = 0
+
+    def _changed(self, rows: Optional[List[RankedStudent]]):
+        self._rows = rows
+        self._bodies.clear()
+        self.generation += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._changed(None)
+
+    # --------------------------- Updates ---------------------------
+    def on_event(self, event: ScoringEvent):
+        if event.kind == "totals":
+            self._apply(event.student_id, event.data or {})
+        else:
+            self.invalidate()
+
+    def _apply(self, student_id: int, totals: Dict):
+        with self._lock:
+            rows = self._rows
+            if rows is None:
+                # Makes a fill that is running right now discard its result
+                self.generation += 1
+                return
+
+            position = next((i for i, row in enumerate(rows) if row.id == student_id), None)
+            base = rows[position] if position is not None else leaderboard_index.get_student(student_id)
+            if base is None:
+                self._changed(None)
+                return
+            row = replace(base, **{field: totals[field] for field in TOTAL_FIELDS if field in totals})
+
+            # With a full list, everyone outside it ranks after the k-th row
+            full = len(rows) >= self.size
+            kth = rows[-1].key if rows else None
+            if full and kth is not None and row.key > kth:
+                if position is not None:
+                    # Fell out; who moves in is unknown here
+                    self._changed(None)
+                return
+
+            others = [r for r in rows if r.id != student_id]
+            self._changed(sorted(others + [row], key=lambda r: r.key)[: self.size])
+
+    # --------------------------- Reads ---------------------------
+    def _ensure(self, db: Session):
+        with self._lock:
+            if self._rows is not None:
+                return
+            generation = self.generation
+        rows = [row for row, _ in get_top_rows(db, self.size)]
+        with self._lock:
+            # An update landed while querying: the rows may already be stale
+            if self._rows is None and self.generation == generation:
+                self._rows = rows
+
+    def _render(self, rows: List[RankedStudent], k: int) -> bytes:
+        ranked = [
+            (rank, row, leaderboard_index.department_name(row.department_id))
+            for rank, row in enumerate(rows[:k], start=1)
+        ]
+        # A full list may have more rows behind it; a short one is the whole board
+        has_more = len(rows) > k or len(rows) == self.size
+        return build_page(ranked, k, has_more=has_more).model_dump_json().encode()
+
+    def response(self, db: Session, k: int) -> Tuple[str, Callable[[], bytes]]:
+        """(etag, body getter) for the top k rows, k <= size."""
+        self._ensure(db)
+        with self._lock:
+            rows, generation = self._rows, self.generation
+            cached = self._bodies.get(k)
+        if rows is None:
+            # Lost a race with an update; answer this one from the database
+            ranked = [(rank, row, name) for rank, (row, name) in enumerate(get_top_rows(db, k + 1), start=1)]
+            body = build_page(ranked, k).model_dump_json().encode()
+            return _content_etag(body), lambda: body
+
+        etag = f'"{_BOOT_ID}-top{generation}-{k}"'
+        if cached is not None:
+            return etag, lambda: cached
+
+        def body() -> bytes:
+            rendered = self._render(rows, k)
+            with self._lock:
+                if self.generation == generation:
+                    self._bodies[k] = rendered
+            return rendered
+
+        return etag, body
+
+
+top_k_cache = TopKCache(size=TOP_K_MAX)
+scoring_events.add_listener(top_k_cache.on_event)
@@ -0,0 +1,441 @@
+# app/services/leaderboard_index.py
+import bisect
+import os
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.department import Department
+from app.models.student import Student
+from app.models.student_total import StudentTotal
+
+
+def ranking_key(composite, academics, wins, technical, created_at, student_id) -> Tuple:
+    """
+    Sort key matching the leaderboard tie-break order:
+    composite, academics, wins, technical (all descending), then earliest
+    registration. Students without created_at sort last, like NULLs in
+    PostgreSQL, and the id keeps the order total.
+    """
+    return (
+        -(composite or 0),
+        -(academics or 0),
+        -(wins or 0),
+        -(technical or 0),
+        created_at or datetime.max,
+        student_id,
+    )
+
+
+TOTAL_FIELDS = [
+    "academics_points",
+    "sports_points",
+    "cultural_points",
+    "technical_points",
+    "social_points",
+    "composite_points",
+    "wins",
+]
+
+
+@dataclass
+class RankedStudent:
+    id: int
+    student_id: str
+    name: str
+    year: Optional[int]
+    department_id: Optional[int]
+    created_at: Optional[datetime]
+    academics_points: int = 0
+    sports_points: int = 0
+    cultural_points: int = 0
+    technical_points: int = 0
+    social_points: int = 0
+    composite_points: int = 0
+    wins: int = 0
+    # student_totals.revision of the totals above (0 when not known)
+    revision: int = 0
+
+    @property
+    def key(self) -> Tuple:
+        return ranking_key(
+            self.composite_points,
+            self.academics_points,
+            self.wins,
+            self.technical_points,
+            self.created_at,
+            self.id,
+        )
+
+
+# Set LEADERBOARD_INDEX=off when running several workers: each process would
+# otherwise hold its own copy, and the routes fall back to keyset SQL.
+LEADERBOARD_INDEX_ENABLED = os.getenv("LEADERBOARD_INDEX", "on").lower() not in ("0", "false", "off")
+
+
+def ranking_order():
+    """
+    Tie-break columns as (expression, descending) pairs, in the same order as
+    ranking_key. The first four are covered by ix_student_totals_ranking.
+    """
+    return [
+        (StudentTotal.composite_points, True),
+        (StudentTotal.academics_points, True),
+        (StudentTotal.wins, True),
+        (StudentTotal.technical_points, True),
+        (func.coalesce(Student.created_at, datetime.max), False),
+        (Student.id, False),
+    ]
+
+
+def ranking_order_by():
+    """ORDER BY clauses for ranking_order()."""
+    return [expr.desc() if descending else expr.asc() for expr, descending in ranking_order()]
+
+
+def ranked_rows_query(db: Session):
+    """
+    Leaderboard columns as plain tuples (no ORM objects), in RankedStudent
+    field order. Only students with a StudentTotal row are ranked.
+    """
+    return (
+        db.query(
+            Student.id,
+            Student.student_id,
+            Student.name,
+            Student.year,
+            Student.department_id,
+            Student.created_at,
+            StudentTotal.academics_points,
+            StudentTotal.sports_points,
+            StudentTotal.cultural_points,
+            StudentTotal.technical_points,
+            StudentTotal.social_points,
+            StudentTotal.composite_points,
+            StudentTotal.wins,
+        )
+        .join(StudentTotal, Student.id == StudentTotal.student_id)
+    )
+
+
+def _student_rows(db: Session) -> List[Tuple[RankedStudent, bool]]:
+    """
+    Every student with their totals (zero when they have no StudentTotal
+    row yet) and whether they are ranked at all.
+    """
+    query = (
+        db.query(
+            Student.id,
+            Student.student_id,
+            Student.name,
+            Student.year,
+            Student.department_id,
+            Student.created_at,
+            *[func.coalesce(getattr(StudentTotal, field), 0) for field in TOTAL_FIELDS],
+            func.coalesce(StudentTotal.revision, 0),
+            StudentTotal.student_id.isnot(None),
+        )
+        .outerjoin(StudentTotal, Student.id == StudentTotal.student_id)
+    )
+    return [(RankedStudent(*row[:-1]), bool(row[-1])) for row in query.all()]
+
+
+class LeaderboardIndex:
+    """
+    Process-local ranked view of the leaderboard.
+
+    Keeps one sorted list of ranking keys for the whole college plus one per
+    department and per year, so every board is read in order without a query.
+    A student update is a dict lookup plus a remove/insert on three lists:
+    finding the position is an O(log n) bisect, but deleting from and
+    inserting into a Python list shifts the tail, an O(n) memmove. That
+    is a pointer copy of a few hundred KB at worst for a college-sized
+    board, well below a database round trip, so plain lists are kept.
+
+    Every student's name, department and year are cached too, so totals
+    pushed from a committed transaction can be placed without a query.
+
+    Loads are single-flight. Updates that arrive while one is reading the
+    database are buffered and replayed once the new lists are swapped in,
+    so a commit landing after the load's snapshot is never lost.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._loading = False
+        self._pending: List[Callable[[], None]] = []
+        self._students: Dict[int, RankedStudent] = {}
+        self._ranked: Dict[int, Tuple] = {}
+        self._college: List[Tuple] = []
+        self._by_department: Dict[int, List[Tuple]] = {}
+        self._by_year: Dict[int, List[Tuple]] = {}
+        self._departments: Dict[int, str] = {}
+        self.ready = False
+
+    # --------------------------- Seeding ---------------------------
+    def load(self, db: Session):
+        """Rebuild the whole index from the database."""
+        with self._load_lock:
+            self._load(db)
+
+    def _load(self, db: Session):
+        with self._lock:
+            self._loading = True
+            self._pending = []
+        try:
+            rows = _student_rows(db)
+            departments = dict(db.query(Department.id, Department.name).all())
+        except Exception:
+            with self._lock:
+                self._loading = False
+                self._pending = []
+            raise
+
+        with self._lock:
+            self._departments = departments
+            self._students = {row.id: row for row, _ in rows}
+            self._ranked = {row.id: row.key for row, ranked in rows if ranked}
+            self._rebuild_lists()
+            self._loading = False
+            self.ready = True
+            # Commits that landed while reading; one may invalidate us again
+            pending, self._pending = self._pending, []
+            for update in pending:
+                update()
+
+    def _defer(self, update: Callable[[], None]) -> bool:
+        """Buffer `update` while a load is running. Call with the lock held."""
+        if self._loading:
+            self._pending.append(update)
+        return self._loading
+
+    def _rebuild_lists(self):
+        """Recompute every key and re-sort all lists from scratch."""
+        self._college = []
+        self._by_department = {}
+        self._by_year = {}
+        for student_id in self._ranked:
+            row = self._students[student_id]
+            key = row.key
+            self._ranked[student_id] = key
+            self._college.append(key)
+            self._by_department.setdefault(row.department_id, []).append(key)
+            self._by_year.setdefault(row.year, []).append(key)
+        self._college.sort()
+        for keys in self._by_department.values():
+            keys.sort()
+        for keys in self._by_year.values():
+            keys.sort()
+
+    def ensure_loaded(self, db: Session):
+        if self.enabled and not self.ready:
+            with self._load_lock:
+                # Another request may have loaded it while we waited
+                if not self.ready:
+                    self._load(db)
+
+    # --------------------------- Updates ---------------------------
+    def _insert(self, row: RankedStudent):
+        key = row.key
+        self._students[row.id] = row
+        self._ranked[row.id] = key
+        bisect.insort(self._college, key)
+        bisect.insort(self._by_department.setdefault(row.department_id, []), key)
+        bisect.insort(self._by_year.setdefault(row.year, []), key)
+
+    def _discard(self, student_id: int):
+        key = self._ranked.pop(student_id, None)
+        if key is None:
+            return
+        row = self._students[student_id]
+        for keys in (
+            self._college,
+            self._by_department.get(row.department_id, []),
+            self._by_year.get(row.year, []),
+        ):
+            pos = bisect.bisect_left(keys, key)
+            if pos < len(keys) and keys[pos] == key:
+                del keys[pos]
+
+    def apply_totals(self, student_id: int, totals: dict, revision: Optional[int] = None):
+        """
+        Place a student using freshly committed totals (any of TOTAL_FIELDS).
+        Commit callbacks may run in any order, so totals whose `revision`
+        (student_totals.revision) is not newer than the held one are ignored.
+        A student this process has never seen marks the index stale instead,
+        so the next read reloads it.
+        """
+        with self._lock:
+            if self._defer(partial(self.apply_totals, student_id, totals, revision)) or not self.ready:
+                return
+            row = self._students.get(student_id)
+            if row is None:
+                self.ready = False
+                return
+            updated = self._updated(row, totals, revision)
+            if updated is not None:
+                self._discard(student_id)
+                self._insert(updated)
+
+    @staticmethod
+    def _updated(row: RankedStudent, totals: dict, revision: Optional[int]) -> Optional[RankedStudent]:
+        """`row` with `totals` applied, or None when they are older than it."""
+        if revision is not None and revision <= row.revision:
+            return None
+        changes = {f: totals[f] for f in TOTAL_FIELDS if f in totals}
+        if revision is not None:
+            changes["revision"] = revision
+        return replace(row, **changes)
+
+    def apply_many(self, totals: Dict[int, dict], revisions: Dict[int, int]):
+        """
+        Swap in many students' new totals at once (a cohort-wide re-score)
+        and re-sort every list once. Same revision check as apply_totals.
+        """
+        with self._lock:
+            if self._defer(partial(self.apply_many, totals, revisions)) or not self.ready:
+                return
+            for student_id, values in totals.items():
+                row = self._students.get(student_id)
+                if row is None:
+                    continue
+                updated = self._updated(row, values, revisions.get(student_id))
+                if updated is not None:
+                    self._students[student_id] = updated
+            self._rebuild_lists()
+
+    def set_student(self, student):
+        """Cache a created or edited student's name, department and year."""
+        with self._lock:
+            if self._defer(partial(self.set_student, student)) or not self.ready:
+                return
+            row = self._students.get(student.id)
+            ranked = student.id in self._ranked
+            self._discard(student.id)
+            meta = dict(
+                student_id=student.student_id,
+                name=student.name,
+                year=student.year,
+                department_id=student.department_id,
+                created_at=student.created_at,
+            )
+            row = replace(row, **meta) if row else RankedStudent(id=student.id, **meta)
+            self._students[student.id] = row
+            if ranked:
+                self._insert(row)
+
+    def remove_student(self, student_id: int):
+        with self._lock:
+            if self._defer(partial(self.remove_student, student_id)):
+                return
+            self._discard(student_id)
+            self._students.pop(student_id, None)
+
+    def invalidate(self):
+        """Drop the index; the next read reloads it from the database."""
+        with self._lock:
+            # A load in flight may have read the data from before the change
+            if not self._defer(self.invalidate):
+                self.ready = False
+
+    # --------------------------- Departments ---------------------------
+    def set_department(self, department_id: int, name: str):
+        with self._lock:
+            if self._defer(partial(self.set_department, department_id, name)):
+                return
+            self._departments[department_id] = name
+
+    def remove_department(self, department_id: int):
+        with self._lock:
+            if self._defer(partial(self.remove_department, department_id)):
+                return
+            self._departments.pop(department_id, None)
+
+    def has_department(self, department_id: int) -> bool:
+        return department_id in self._departments
+
+    def department_name(self, department_id: Optional[int]) -> Optional[str]:
+        return self._departments.get(department_id)
+
+    # --------------------------- Reads ---------------------------
+    def get_student(self, student_id: int) -> Optional[RankedStudent]:
+        return self._students.get(student_id)
+
+    def rank_of(self, student_id: int) -> Optional[int]:
+        """1-based college rank of a student, or None if they are not ranked."""
+        with self._lock:
+            key = self._ranked.get(student_id)
+            if key is None:
+                return None
+            return bisect.bisect_left(self._college, key) + 1
+
+    def standing(self, student_id: int, k: int = 0) -> Optional[dict]:
+        """
+        A student's position on the college, department and year boards
+        as (rank, board size) pairs, plus the k college neighbours above
+        and below. Bisects on the sorted keys; None if not ranked.
+        """
+        with self._lock:
+            key = self._ranked.get(student_id)
+            if key is None:
+                return None
+            row = self._students[student_id]
+            boards = {
+                "college": self._college,
+                "department": self._by_department.get(row.department_id, []),
+                "year": self._by_year.get(row.year, []),
+            }
+            positions = {
+                name: (bisect.bisect_left(keys, key) + 1, len(keys))
+                for name, keys in boards.items()
+            }
+            pos = positions["college"][0] - 1
+            above = [self._students[key[-1]] for key in self._college[max(pos - k, 0):pos]]
+            below = [self._students[key[-1]] for key in self._college[pos + 1:pos + 1 + k]]
+            return {"row": row, "positions": positions, "above": above, "below": below}
+
+    def _resolve(self, keys: List[Tuple]) -> List[RankedStudent]:
+        with self._lock:
+            return [self._students[key[-1]] for key in keys]
+
+    def _keys(self, department_id: Optional[int] = None, year: Optional[int] = None) -> List[Tuple]:
+        if department_id is not None:
+            return self._by_department.get(department_id, [])
+        if year is not None:
+            return self._by_year.get(year, [])
+        return self._college
+
+    def college(self) -> List[RankedStudent]:
+        return self._resolve(self._college)
+
+    def department(self, department_id: int) -> List[RankedStudent]:
+        return self._resolve(self._keys(department_id=department_id))
+
+    def year(self, year: int) -> List[RankedStudent]:
+        return self._resolve(self._keys(year=year))
+
+    def page(
+        self,
+        after: Optional[Tuple] = None,
+        limit: int = 50,
+        department_id: Optional[int] = None,
+        year: Optional[int] = None,
+    ) -> Tuple[int, List[RankedStudent]]:
+        """
+        Return (rank of the first row, rows) for the slice that follows the
+        ranking key `after`. Ranks are 1-based positions in the board.
+        """
+        with self._lock:
+            keys = self._keys(department_id, year)
+            start = bisect.bisect_right(keys, after) if after is not None else 0
+            return start + 1, [self._students[key[-1]] for key in keys[start:start + limit]]
+
+
+leaderboard_index = LeaderboardIndex(enabled=LEADERBOARD_INDEX_ENABLED)
@@ -0,0 +1,434 @@
+# app/services/leaderboard_service.py
+import base64
+import json
+from datetime import date, datetime
+from fractions import Fraction
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.models.department import Department
+from app.models.department_total import DepartmentTotal
+from app.models.student import Student
+from app.models.student_total import StudentTotal
+from app.schemas import (
+    BoardPosition,
+    DepartmentLeaderboard,
+    DepartmentStanding,
+    LeaderboardEntry,
+    LeaderboardPage,
+    StudentStanding,
+)
+from app.services.daily_buckets import window_totals_select
+from app.services.department_rollup import ROLLUP_FIELDS
+from app.services.leaderboard_index import (
+    RankedStudent,
+    leaderboard_index,
+    ranked_rows_query,
+    ranking_key,
+    ranking_order,
+    ranking_order_by,
+    TOTAL_FIELDS,
+)
+from app.services.scoring_engine import get_weights
+
+
+# --------------------------- Cursors ---------------------------
+def encode_cursor(row: RankedStudent, rank: int) -> str:
+    """
+    Opaque keyset cursor: the tie-break values of the last row on the page
+    plus its rank, so the next page can number its rows without a count.
+    """
+    payload = [
+        row.composite_points,
+        row.academics_points,
+        row.wins,
+        row.technical_points,
+        row.created_at.isoformat() if row.created_at else None,
+        row.id,
+        rank,
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[list, int]:
+    """Return (tie-break values, rank). Raises ValueError on a malformed cursor."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        composite, academics, wins, technical, created_at, student_id, rank = payload
+        created = datetime.fromisoformat(created_at) if created_at else datetime.max
+        # Registration times are naive UTC; an offset could not be compared
+        if created.tzinfo is not None:
+            raise ValueError("timezone-aware created_at")
+        values = [int(composite), int(academics), int(wins), int(technical), created, int(student_id)]
+        return values, int(rank)
+    except (TypeError, ValueError, json.JSONDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def _keyset_after(order, values, before: bool = False):
+    """
+    Rows strictly after `values` in a mixed-direction ORDER BY (or strictly
+    before it with before=True), written as (a < x) OR (a = x AND b < y)
+    OR ... so the ranking index can be used.
+    """
+    clauses = []
+    for i, (expr, descending) in enumerate(order):
+        ties = [col == value for (col, _), value in zip(order[:i], values[:i])]
+        step = expr < values[i] if descending != before else expr > values[i]
+        clauses.append(and_(*ties, step))
+    return or_(*clauses)
+
+def _key_values(row: RankedStudent) -> list:
+    """ranking_order() values of a row, for keyset predicates."""
+    return [
+        row.composite_points,
+        row.academics_points,
+        row.wins,
+        row.technical_points,
+        row.created_at or datetime.max,
+        row.id,
+    ]
+
+
+# --------------------------- Pages ---------------------------
+def _entry(rank: int, row: RankedStudent, department_name: Optional[str]) -> LeaderboardEntry:
+    return LeaderboardEntry(
+        rank=rank,
+        id=row.id,
+        name=row.name,
+        department=department_name,
+        academics_points=row.academics_points,
+        sports_points=row.sports_points,
+        cultural_points=row.cultural_points,
+        technical_points=row.technical_points,
+        social_points=row.social_points,
+        composite_points=row.composite_points,
+        wins=row.wins,
+    )
+
+
+def build_page(
+    ranked: List[Tuple[int, RankedStudent, Optional[str]]],
+    limit: int,
+    has_more: Optional[bool] = None,
+) -> LeaderboardPage:
+    """
+    A page from up to limit + 1 (rank, row, department name) tuples; the
+    extra one only tells whether a next_cursor is needed, unless has_more
+    says so directly.
+    """
+    entries = [_entry(rank, row, name) for rank, row, name in ranked[:limit]]
+    if has_more is None:
+        has_more = len(ranked) > limit
+    next_cursor = None
+    if has_more and entries:
+        rank, row, _ = ranked[limit - 1]
+        next_cursor = encode_cursor(row, rank)
+    return LeaderboardPage(entries=entries, next_cursor=next_cursor)
+
+
+def _sql_rows(
+    db: Session,
+    after: Optional[list],
+    limit: int,
+    department_id: Optional[int],
+    year: Optional[int],
+    before: bool = False,
+) -> List[Tuple[RankedStudent, Optional[str]]]:
+    """
+    Up to `limit` ranked rows following `after` in board order, or with
+    before=True the `limit` rows just ahead of it (still in board order).
+    """
+    order = ranking_order()
+    query = ranked_rows_query(db).add_columns(Department.name).outerjoin(
+        Department, Department.id == Student.department_id
+    )
+    if department_id is not None:
+        query = query.filter(Student.department_id == department_id)
+    if year is not None:
+        query = query.filter(Student.year == year)
+    if after is not None:
+        query = query.filter(_keyset_after(order, after, before=before))
+
+    if before:
+        order_by = [expr.asc() if descending else expr.desc() for expr, descending in order]
+    else:
+        order_by = ranking_order_by()
+    rows = (
+        query.order_by(*order_by)
+        .limit(limit)
+        .all()
+    )
+    if before:
+        rows.reverse()
+    return [(RankedStudent(*row[:-1]), row[-1]) for row in rows]
+
+
+def get_top_rows(db: Session, k: int) -> List[Tuple[RankedStudent, Optional[str]]]:
+    """
+    The first k rows of the college board straight from the database:
+    ORDER BY the full tie-break LIMIT k. ix_student_totals_ranking yields
+    rows already sorted on the score columns, so only the few ties on
+    registration time and id are sorted (incremental sort) and the scan
+    stops after k rows whatever the cohort size.
+    """
+    return _sql_rows(db, None, k, None, None)
+
+
+def get_leaderboard_page(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    department_id: Optional[int] = None,
+    year: Optional[int] = None,
+) -> LeaderboardPage:
+    """
+    One keyset page of a leaderboard (college-wide, or filtered to a
+    department or year). Served from the in-memory index when it is enabled,
+    otherwise from a single ordered SQL query over column tuples.
+    """
+    after, last_rank = decode_cursor(cursor) if cursor else (None, 0)
+
+    leaderboard_index.ensure_loaded(db)
+    if leaderboard_index.ready:
+        key = ranking_key(*after) if after is not None else None
+        first_rank, rows = leaderboard_index.page(key, limit + 1, department_id, year)
+        ranked = [
+            (first_rank + i, row, leaderboard_index.department_name(row.department_id))
+            for i, row in enumerate(rows)
+        ]
+    else:
+        rows = _sql_rows(db, after, limit + 1, department_id, year)
+        ranked = [(last_rank + 1 + i, row, name) for i, (row, name) in enumerate(rows)]
+
+    return build_page(ranked, limit)
+
+
+def get_window_page(
+    db: Session,
+    start: date,
+    end: date,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> LeaderboardPage:
+    """
+    One keyset page of the college leaderboard over points earned from
+    `start` to `end` (UTC days, inclusive), summed from the daily buckets
+    with the current weights and the usual tie-break. Students without
+    points in the window are not listed. Always SQL: the in-memory index
+    only holds all-time totals.
+    """
+    after, last_rank = decode_cursor(cursor) if cursor else (None, 0)
+
+    window = window_totals_select(start, end, get_weights(db)).subquery("window")
+    order = [
+        (window.c.composite_points, True),
+        (window.c.academics_points, True),
+        (window.c.wins, True),
+        (window.c.technical_points, True),
+        (func.coalesce(Student.created_at, datetime.max), False),
+        (Student.id, False),
+    ]
+    query = (
+        db.query(
+            Student.id,
+            Student.student_id,
+            Student.name,
+            Student.year,
+            Student.department_id,
+            Student.created_at,
+            *[window.c[field] for field in TOTAL_FIELDS],
+            Department.name,
+        )
+        .join(window, window.c.student_id == Student.id)
+        .outerjoin(Department, Department.id == Student.department_id)
+    )
+    if after is not None:
+        query = query.filter(_keyset_after(order, after))
+    rows = (
+        query.order_by(*[expr.desc() if descending else expr.asc() for expr, descending in order])
+        .limit(limit + 1)
+        .all()
+    )
+
+    ranked = [(last_rank + 1 + i, RankedStudent(*row[:-1]), row[-1]) for i, row in enumerate(rows)]
+    page = build_page(ranked, limit)
+    page.window_start, page.window_end = start, end
+    return page
+
+
+# --------------------------- Student standing ---------------------------
+def _count_ahead(db: Session, values: list, *criteria) -> int:
+    """
+    Ranked students ahead of the ranking_order() `values`, within
+    `criteria`. Anyone ahead has at least the same composite, so that bound
+    keeps the scan to the head of ix_student_totals_ranking: the cost
+    follows the student's rank, not the cohort size.
+    """
+    return (
+        db.query(func.count())
+        .select_from(Student)
+        .join(StudentTotal, Student.id == StudentTotal.student_id)
+        .filter(
+            StudentTotal.composite_points >= values[0],
+            _keyset_after(ranking_order(), values, before=True),
+            *criteria,
+        )
+        .scalar()
+    )
+
+
+def _same(column, value):
+    # NULL-safe equality that can still use an index on the column
+    return column.is_(None) if value is None else column == value
+
+
+def _sql_standing(db: Session, student_id: int, k: int) -> Optional[dict]:
+    """
+    SQL form of LeaderboardIndex.standing(). The students ahead on each
+    board are counted with range scans bounded by the student's rank, and
+    two keyset queries fetch the neighbours. The department size is read
+    from department_totals; the college and year sizes take one aggregate
+    over the ranked students, the part that still grows with the cohort.
+    The in-memory index avoids both.
+    """
+    result = ranked_rows_query(db).filter(Student.id == student_id).first()
+    if result is None:
+        return None
+    row = RankedStudent(*result)
+    values = _key_values(row)
+    same_department = _same(Student.department_id, row.department_id)
+    same_year = _same(Student.year, row.year)
+
+    ranked = (
+        db.query(func.count(), func.count().filter(same_year))
+        .select_from(Student)
+        .join(StudentTotal, Student.id == StudentTotal.student_id)
+    )
+    college_size, year_size = ranked.one()
+    department_size = None
+    if row.department_id is not None:
+        department_size = (
+            db.query(DepartmentTotal.student_count)
+            .filter(DepartmentTotal.department_id == row.department_id)
+            .scalar()
+        )
+    if department_size is None:
+        # Students without a department are not rolled up
+        department_size = ranked.filter(same_department).with_entities(func.count()).scalar()
+
+    positions = {
+        "college": (_count_ahead(db, values) + 1, college_size),
+        "department": (_count_ahead(db, values, same_department) + 1, department_size),
+        "year": (_count_ahead(db, values, same_year) + 1, year_size),
+    }
+    above = [r for r, _ in _sql_rows(db, values, k, None, None, before=True)] if k else []
+    below = [r for r, _ in _sql_rows(db, values, k, None, None)] if k else []
+    return {"row": row, "positions": positions, "above": above, "below": below}
+
+
+def get_student_standing(db: Session, student_id: int, k: int = 2) -> Optional[StudentStanding]:
+    """
+    A student's college / department / year rank, college percentile and
+    the k students directly above and below them on the college board.
+    Returns None when the student is not on the leaderboard.
+    """
+    leaderboard_index.ensure_loaded(db)
+    if leaderboard_index.ready:
+        standing = leaderboard_index.standing(student_id, k)
+        department_name = leaderboard_index.department_name
+    else:
+        standing = _sql_standing(db, student_id, k)
+        names = dict(db.query(Department.id, Department.name).all())
+        department_name = names.get
+    if standing is None:
+        return None
+
+    positions = standing["positions"]
+    rank, size = positions["college"]
+    above, below = standing["above"], standing["below"]
+    return StudentStanding(
+        student=_entry(rank, standing["row"], department_name(standing["row"].department_id)),
+        college=BoardPosition(rank=rank, size=size),
+        department=BoardPosition(rank=positions["department"][0], size=positions["department"][1]),
+        year=BoardPosition(rank=positions["year"][0], size=positions["year"][1]),
+        # Share of the college ranked below this student
+        percentile=round(100.0 * (size - rank) / size, 1),
+        above=[
+            _entry(rank - len(above) + i, row, department_name(row.department_id))
+            for i, row in enumerate(above)
+        ],
+        below=[
+            _entry(rank + 1 + i, row, department_name(row.department_id))
+            for i, row in enumerate(below)
+        ],
+    )
+
+
+# --------------------------- Department cup ---------------------------
+DEPARTMENT_RANKINGS = ("average", "total")
+
+
+def _rank_departments(rows, by: str) -> List[DepartmentStanding]:
+    """
+    Rank rollup rows (id, name and ROLLUP_FIELDS) as described in
+    get_department_rankings.
+    """
+    def value(row):
+        if not row["student_count"]:
+            return None
+        if by == "average":
+            # Exact, so equal averages tie regardless of float rounding
+            return Fraction(row["composite_points"], row["student_count"])
+        return row["composite_points"]
+
+    scored = sorted(
+        ((value(row), row) for row in rows),
+        key=lambda item: (item[0] is None, -(item[0] or 0), item[1]["name"] or ""),
+    )
+
+    entries = []
+    rank, previous = 0, object()
+    for position, (score, row) in enumerate(scored, start=1):
+        if score != previous:
+            rank, previous = position, score
+        count = row["student_count"]
+        entries.append(
+            DepartmentStanding(
+                rank=rank,
+                department_id=row["id"],
+                name=row["name"] or "",
+                average_composite=round(row["composite_points"] / count, 2) if count else 0.0,
+                **{field: row[field] for field in ROLLUP_FIELDS},
+            )
+        )
+    return entries
+
+
+def get_department_rankings(db: Session, by: str = "average") -> DepartmentLeaderboard:
+    """
+    Every department ranked by the average (default) or total composite of
+    its ranked students, read straight from the department_totals rollup.
+
+    Departments tied on that value share a rank and the next one skips
+    ahead (1, 2, 2, 4); ties are listed by name. Departments with nobody on
+    the leaderboard come last, tied with each other.
+    """
+    if by not in DEPARTMENT_RANKINGS:
+        raise ValueError(f"by must be one of: {', '.join(DEPARTMENT_RANKINGS)}")
+
+    table = DepartmentTotal.__table__
+    rows = [
+        row._mapping
+        for row in db.query(
+            Department.id,
+            Department.name,
+            *[func.coalesce(table.c[field], 0).label(field) for field in ROLLUP_FIELDS],
+        )
+        .outerjoin(table, table.c.department_id == Department.id)
+        .all()
+    ]
+
+    return DepartmentLeaderboard(by=by, entries=_rank_departments(rows, by))
@@ -0,0 +1,134 @@
+# app/services/notifications.py
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.database import after_commit
+from app.models.admin_notification_status import AdminNotificationStatus
+
+# How long a cached unread count may be served. Writes made through this
+# process drop it at once; the TTL bounds staleness from other workers.
+UNREAD_COUNT_TTL = 5.0
+
+_lock = threading.Lock()
+_unread: Optional[int] = None
+_unread_at = 0.0
+
+
+def unread_count(db: Session) -> int:
+    """
+    Number of unseen admin notifications. Counted with the partial
+    ix_admin_notification_status_unseen index at most once per TTL, no
+    matter how many admin tabs are polling.
+    """
+    global _unread, _unread_at
+    with _lock:
+        if _unread is not None and time.monotonic() - _unread_at < UNREAD_COUNT_TTL:
+            return _unread
+
+    count = (
+        db.query(func.count(AdminNotificationStatus.id))
+        .filter(AdminNotificationStatus.seen == False)
+        .scalar()
+    )
+    with _lock:
+        _unread, _unread_at = count, time.monotonic()
+    return count
+
+
+def _drop_unread_count():
+    global _unread
+    with _lock:
+        _unread = None
+
+
+def invalidate_unread_count(db: Session):
+    """Drop the cached count once the current transaction commits."""
+    after_commit(db, _drop_unread_count)
+
+
+def mark_seen(db: Session, up_to_id: Optional[int] = None) -> int:
+    """
+    Mark unseen notifications as seen with a single UPDATE. With `up_to_id`
+    only notifications for point transactions up to that id are touched,
+    so ones that arrived after the admin's last fetch stay unread.
+    Does not commit. Returns the number of rows updated.
+    """
+    stmt = (
+        update(AdminNotificationStatus)
+        .where(AdminNotificationStatus.seen == False)
+        .values(seen=True)
+        .execution_options(synchronize_session=False)
+    )
+    if up_to_id is not None:
+        stmt = stmt.where(AdminNotificationStatus.point_transaction_id <= up_to_id)
+    updated = db.execute(stmt).rowcount
+    if updated:
+        invalidate_unread_count(db)
+    return updated
+
+
+# --------------------------- Long-poll feed ---------------------------
+class NotificationFeed:
+    """
+    Wakes long-polling admin requests when a participation is committed.
+
+    Publishers run in worker threads (sync routes), waiters on the event
+    loop, so publish() hands the wake-up to the loop thread-safely. Only a
+    count of publishes is kept, not ids: participations can commit out of
+    id order, and the rows themselves are always read from the database.
+
+    Wake-ups are per process. With several workers, a participation
+    committed through another worker is only seen when the waiting
+    request times out and queries again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._published = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def generation(self) -> int:
+        """Number of publishes so far; take it before querying for rows."""
+        with self._lock:
+            return self._published
+
+    def publish(self):
+        """Record a committed participation. Safe to call from any thread."""
+        with self._lock:
+            self._published += 1
+            loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(lambda: loop.create_task(self._notify()))
+
+    async def _notify(self):
+        async with self._condition:
+            self._condition.notify_all()
+
+    async def wait(self, generation: int, timeout: float) -> bool:
+        """
+        Wait until a participation is published by this process after
+        `generation`, or `timeout` seconds pass. Returns True if woken.
+        """
+        if self._condition is None:
+            with self._lock:
+                self._loop = asyncio.get_running_loop()
+            self._condition = asyncio.Condition()
+        try:
+            async with self._condition:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: self.generation > generation),
+                    timeout,
+                )
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+notification_feed = NotificationFeed()
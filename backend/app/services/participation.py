@@ -0,0 +1,147 @@
+# app/services/participation.py
+from enum import Enum
+
+from sqlalchemy import case, exists, false, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.database import after_commit
+from app.models.admin_notification_status import AdminNotificationStatus
+from app.models.department_total import DepartmentTotal
+from app.models.event import Event
+from app.models.point_transaction import PARTICIPATION_REASON, PointTransaction, TransactionKind
+from app.models.student import Student
+from app.models.student_total import StudentTotal
+from app.services.leaderboard_index import TOTAL_FIELDS, leaderboard_index
+from app.services.notifications import invalidate_unread_count, notification_feed
+from app.services.scoring_events import scoring_events
+from app.services.scoring_engine import POINT_CATEGORIES
+
+
+class Registration(str, Enum):
+    REGISTERED = "registered"
+    ALREADY_REGISTERED = "already_registered"
+    EVENT_NOT_FOUND = "event_not_found"
+    STUDENT_NOT_FOUND = "student_not_found"
+
+
+def _registration_statement(student_id: int, event_id: int):
+    """
+    The single statement behind register_participation. Its one row has
+    inserted, notified, newly_ranked, department_counted, event_exists and
+    student_exists.
+    """
+    pt = PointTransaction.__table__
+    student_exists = exists().where(Student.id == student_id)
+    event_exists = exists().where(Event.id == event_id)
+
+    # Same fallback as before: unknown event categories count as academics
+    category = case(
+        (Event.category.in_(POINT_CATEGORIES), Event.category),
+        else_=literal("academics"),
+    )
+    participation = (
+        insert(pt)
+        .from_select(
+            ["student_id", "event_id", "points", "category", "reason", "kind"],
+            select(
+                literal(student_id),
+                Event.id,
+                literal(0),
+                category,
+                literal(PARTICIPATION_REASON),
+                literal(int(TransactionKind.PARTICIPATION)),
+            )
+            .where(Event.id == event_id, student_exists),
+        )
+        .on_conflict_do_nothing(
+            index_elements=[pt.c.student_id, pt.c.event_id],
+            index_where=text(f"kind = {int(TransactionKind.PARTICIPATION)}"),
+        )
+        .returning(pt.c.id)
+        .cte("participation")
+    )
+
+    notification = (
+        insert(AdminNotificationStatus.__table__)
+        .from_select(["point_transaction_id", "seen"], select(participation.c.id, false()))
+        .returning(AdminNotificationStatus.__table__.c.id)
+        .cte("notification")
+    )
+
+    totals_table = StudentTotal.__table__
+    totals = (
+        insert(totals_table)
+        .from_select(
+            ["student_id", *TOTAL_FIELDS],
+            select(literal(student_id), *[literal(0) for _ in TOTAL_FIELDS]).select_from(participation),
+        )
+        .on_conflict_do_nothing(index_elements=[totals_table.c.student_id])
+        .returning(totals_table.c.student_id)
+        .cte("totals")
+    )
+
+    departments_table = DepartmentTotal.__table__
+    department = insert(departments_table).from_select(
+        ["department_id", "student_count"],
+        select(Student.department_id, literal(1))
+        .join(totals, totals.c.student_id == Student.id)
+        .where(Student.department_id.isnot(None)),
+    )
+    department = (
+        department.on_conflict_do_update(
+            index_elements=[departments_table.c.department_id],
+            set_={
+                "student_count": departments_table.c.student_count + department.excluded.student_count,
+                "updated_at": func.now(),
+            },
+        )
+        .returning(departments_table.c.department_id)
+        .cte("department")
+    )
+
+    return select(
+        select(func.count()).select_from(participation).scalar_subquery().label("inserted"),
+        select(func.count()).select_from(notification).scalar_subquery().label("notified"),
+        select(func.count()).select_from(totals).scalar_subquery().label("newly_ranked"),
+        select(func.count()).select_from(department).scalar_subquery().label("department_counted"),
+        event_exists.label("event_exists"),
+        student_exists.label("student_exists"),
+    )
+
+
+def register_participation(db: Session, student_id: int, event_id: int) -> Registration:
+    """
+    Register a student for an event in a single statement:
+
+      * the zero-point participation transaction is inserted with
+        ON CONFLICT DO NOTHING against uq_point_transactions_participation,
+        so concurrent double submits cannot create two rows;
+      * its admin notification and, for a first-time participant, an empty
+        student_totals row (which puts them on the leaderboard) are inserted
+        from the same statement's RETURNING, and that new row is counted in
+        their department's department_totals.student_count;
+      * existence of the event and the student is reported alongside.
+
+    Does not commit.
+    """
+    row = db.execute(_registration_statement(student_id, event_id)).one()
+
+    if row.inserted:
+        invalidate_unread_count(db)
+        after_commit(db, notification_feed.publish)
+        if row.newly_ranked:
+            totals = {f: 0 for f in TOTAL_FIELDS}
+
+            def _publish():
+                # A freshly inserted row is at its first revision
+                leaderboard_index.apply_totals(student_id, totals, 1)
+                scoring_events.publish_totals({student_id: totals}, {student_id: 1})
+
+            after_commit(db, _publish)
+        return Registration.REGISTERED
+    if not row.event_exists:
+        return Registration.EVENT_NOT_FOUND
+    if not row.student_exists:
+        return Registration.STUDENT_NOT_FOUND
+    return Registration.ALREADY_REGISTERED
@@ -0,0 +1,137 @@
+# app/services/query_plans.py
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.models.point_transaction import PointTransaction, TransactionKind
+
+# Indexes added for the point_transactions / notification read paths
+ACCESS_PATH_INDEXES = [
+    "ix_point_transactions_event_kind",
+    "ix_point_transactions_student_kind",
+    "ix_point_transactions_student_created",
+    "ix_point_transactions_student_category",
+    "ix_admin_notification_status_unseen",
+]
+
+# Tables the hot queries read, and the only indexes they had before any of
+# the above (or uq_point_transactions_participation) existed
+PLANNED_TABLES = ["point_transactions", "admin_notification_status"]
+BASELINE_INDEXES = [
+    "ALTER TABLE point_transactions ADD PRIMARY KEY (id)",
+    "ALTER TABLE admin_notification_status ADD PRIMARY KEY (id)",
+    "ALTER TABLE admin_notification_status ADD UNIQUE (point_transaction_id)",
+]
+
+# The hot queries, in the shape the routes and services issue them
+HOT_QUERIES = {
+    "timeline": """
+        SELECT * FROM point_transactions
+        WHERE student_id = :student_id
+        ORDER BY created_at DESC
+    """,
+    "totals_aggregation": f"""
+        SELECT student_id, category, SUM(points),
+               SUM(CASE WHEN kind = {int(TransactionKind.WINNER)} THEN 1 ELSE 0 END)
+        FROM point_transactions
+        WHERE student_id = :student_id
+        GROUP BY student_id, category
+    """,
+    "wins": f"""
+        SELECT COUNT(*) FROM point_transactions
+        WHERE student_id = :student_id AND kind = {int(TransactionKind.WINNER)}
+    """,
+    "participants": f"""
+        SELECT DISTINCT student_id FROM point_transactions
+        WHERE event_id = :event_id AND kind = {int(TransactionKind.PARTICIPATION)}
+    """,
+    "unread_count": """
+        SELECT COUNT(*) FROM admin_notification_status WHERE seen = false
+    """,
+}
+
+_EXECUTION_TIME = re.compile(r"Execution Time: ([\d.]+) ms")
+
+
+def _busiest(db: Session, column) -> Optional[int]:
+    """The value of `column` with the most ledger rows: the worst case to plan."""
+    row = (
+        db.query(column)
+        .group_by(column)
+        .order_by(func.count().desc())
+        .first()
+    )
+    return row[0] if row else None
+
+
+def _explain(db: Session, params: Dict) -> Dict[str, Dict]:
+    plans = {}
+    for name, sql in HOT_QUERIES.items():
+        lines = [row[0] for row in db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params)]
+        match = next(filter(None, (_EXECUTION_TIME.search(line) for line in lines)), None)
+        plans[name] = {
+            "execution_ms": float(match.group(1)) if match else None,
+            "plan": lines,
+        }
+    return plans
+
+
+def _baseline_copies(db: Session):
+    """
+    Copy PLANNED_TABLES into same-named temp tables carrying only
+    BASELINE_INDEXES. Temp tables come first on the search path, so the
+    hot queries read the copies from here until the transaction ends.
+    The live tables are only read (ACCESS SHARE), never altered.
+    """
+    schema = db.execute(text("SELECT current_schema()")).scalar()
+    for table in PLANNED_TABLES:
+        db.execute(text(f"CREATE TEMP TABLE {table} (LIKE {schema}.{table} INCLUDING DEFAULTS) ON COMMIT DROP"))
+        db.execute(text(f"INSERT INTO pg_temp.{table} SELECT * FROM {schema}.{table}"))
+    for statement in BASELINE_INDEXES:
+        db.execute(text(statement))
+    for table in PLANNED_TABLES:
+        # Autovacuum never analyzes temp tables
+        db.execute(text(f"ANALYZE pg_temp.{table}"))
+
+
+def compare_query_plans(db: Session) -> Dict[str, Dict]:
+    """
+    EXPLAIN ANALYZE every hot query twice: against the live tables, and
+    against temp copies indexed as they were before ACCESS_PATH_INDEXES.
+    The copies are dropped by the rollback at the end and no lock stronger
+    than a read is taken on the live tables, but copying costs time and
+    temp space in proportion to the ledger.
+
+    Returns {query: {"before": ..., "after": ...}} with the plan lines and
+    execution time of each run.
+    """
+    params = {
+        "student_id": _busiest(db, PointTransaction.student_id) or 0,
+        "event_id": _busiest(db, PointTransaction.event_id) or 0,
+    }
+    try:
+        after = _explain(db, params)
+        _baseline_copies(db)
+        before = _explain(db, params)
+    finally:
+        db.rollback()
+
+    return {
+        name: {"before": before[name], "after": after[name]}
+        for name in HOT_QUERIES
+    }
+
+
+def format_query_plans(result: Dict[str, Dict]) -> List[str]:
+    """Side-by-side text report of compare_query_plans()."""
+    lines = []
+    for name, runs in result.items():
+        before, after = runs["before"], runs["after"]
+        lines.append(f"== {name}: {before['execution_ms']} ms -> {after['execution_ms']} ms")
+        for label, run in (("before", before), ("after", after)):
+            lines.append(f"-- {label}")
+            lines.extend(f"   {line}" for line in run["plan"])
+        lines.append("")
+    return lines
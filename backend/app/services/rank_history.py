@@ -0,0 +1,128 @@
+# app/services/rank_history.py
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, exists, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.rank_history import RankHistory
+from app.models.student import Student
+from app.models.student_total import StudentTotal
+from app.services.leaderboard_index import ranking_order_by
+
+# Points younger than this keep daily resolution
+DAILY_RESOLUTION_DAYS = 90
+# Older points are thinned to the last one of each week, then dropped past this
+RETENTION_DAYS = 730
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def record_rank_history(db: Session, day: Optional[date] = None) -> int:
+    """
+    Store every ranked student's college rank and composite for `day`
+    (today, UTC) with one INSERT ... SELECT row_number() OVER (leaderboard
+    order). Re-running it on the same day overwrites that day's points.
+    Does not commit. Returns the number of students recorded.
+    """
+    day = day or _today()
+    table = RankHistory.__table__
+    ranked = (
+        select(
+            StudentTotal.student_id,
+            literal(day),
+            func.row_number().over(order_by=ranking_order_by()),
+            StudentTotal.composite_points,
+        )
+        .select_from(StudentTotal)
+        .join(Student, Student.id == StudentTotal.student_id)
+    )
+    stmt = insert(table).from_select(["student_id", "day", "rank", "composite_points"], ranked)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.student_id, table.c.day],
+        set_={"rank": stmt.excluded.rank, "composite_points": stmt.excluded.composite_points},
+    )
+    return db.execute(stmt).rowcount
+
+
+def compact_rank_history(db: Session, today: Optional[date] = None) -> Dict[str, int]:
+    """
+    Keep storage bounded: points older than DAILY_RESOLUTION_DAYS are
+    thinned to the last one recorded in each week, and points older than
+    RETENTION_DAYS are deleted. Does not commit.
+    """
+    today = today or _today()
+    table = RankHistory.__table__
+    expired = db.execute(
+        delete(table).where(table.c.day < today - timedelta(days=RETENTION_DAYS))
+    ).rowcount
+
+    newer = table.alias("newer")
+    same_week_later = exists().where(
+        newer.c.student_id == table.c.student_id,
+        func.date_trunc("week", newer.c.day) == func.date_trunc("week", table.c.day),
+        newer.c.day > table.c.day,
+    )
+    thinned = db.execute(
+        delete(table).where(
+            table.c.day < today - timedelta(days=DAILY_RESOLUTION_DAYS),
+            same_week_later,
+        )
+    ).rowcount
+    return {"expired": expired, "thinned": thinned}
+
+
+def run_rank_history_job(db: Session, day: Optional[date] = None) -> Dict[str, int]:
+    """
+    The nightly job: record today's ranks, then compact old points, in one
+    transaction. Commits.
+    """
+    day = day or _today()
+    recorded = record_rank_history(db, day)
+    result = {"day": day.isoformat(), "recorded": recorded, **compact_rank_history(db, day)}
+    db.commit()
+    return result
+
+
+# --------------------------- Reading ---------------------------
+def downsample(points: List, max_points: int) -> List:
+    """
+    At most `max_points` of a day-ordered series: the time span is cut into
+    equal buckets and the last point of each is kept, so the newest point
+    always survives.
+    """
+    if len(points) <= max_points:
+        return points
+    first, last = points[0].day, points[-1].day
+    span = (last - first).days + 1
+    kept = {}
+    for point in points:
+        kept[(point.day - first).days * max_points // span] = point
+    return list(kept.values())
+
+
+def get_rank_history(
+    db: Session,
+    student_id: int,
+    days: int = 365,
+    max_points: int = 60,
+    today: Optional[date] = None,
+) -> List[RankHistory]:
+    """
+    A student's recorded ranks over the last `days` days, oldest first,
+    downsampled to at most `max_points`. One primary-key range read.
+    """
+    today = today or _today()
+    points = (
+        db.query(RankHistory)
+        .filter(
+            RankHistory.student_id == student_id,
+            RankHistory.day > today - timedelta(days=days),
+        )
+        .order_by(RankHistory.day)
+        .all()
+    )
+    return downsample(points, max_points)
@@ -0,0 +1,149 @@
+# app/services/scoring_events.py
+import asyncio
+import json
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from app.services.leaderboard_index import TOTAL_FIELDS, leaderboard_index
+
+# Events kept for clients resuming with a version (Last-Event-ID)
+HISTORY_SIZE = 1000
+# Events a slow subscriber may fall behind before it is told to resync
+SUBSCRIBER_BACKLOG = 1000
+
+
+@dataclass(frozen=True)
+class ScoringEvent:
+    version: int
+    kind: str                      # "totals" or "reset"
+    student_id: Optional[int] = None
+    data: Optional[Dict] = None
+
+    def to_sse(self) -> str:
+        payload = {"version": self.version, **(self.data or {})}
+        if self.student_id is not None:
+            payload["student_id"] = self.student_id
+        return f"id: {self.version}\nevent: {self.kind}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    def offer(self, event: ScoringEvent):
+        # Runs on the subscriber's loop. A client that fell too far behind
+        # gets a single reset instead of an ever-growing backlog.
+        if self.queue.qsize() >= SUBSCRIBER_BACKLOG:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = ScoringEvent(event.version, "reset", data={"reason": "backlog"})
+        self.queue.put_nowait(event)
+
+
+class ScoringEventBus:
+    """
+    In-process pub/sub of committed scoring changes.
+
+    Every change gets the next version number. The last HISTORY_SIZE
+    events are kept so a reconnecting client can resume from the version
+    it last saw; older gaps are answered with a "reset" event telling the
+    client to refetch. Publishers may run on any thread.
+
+    In-process listeners (caches derived from the board) are called
+    synchronously on the publishing thread, before subscribers are woken.
+    Both see events strictly in version order, and a student's totals are
+    only published when newer than the last ones sent.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = 0
+        self._history: deque = deque(maxlen=HISTORY_SIZE)
+        self._subscribers: Set[_Subscriber] = set()
+        self._listeners: List[Callable[[ScoringEvent], None]] = []
+        # Last published student_totals.revision per student
+        self._revisions: Dict[int, int] = {}
+
+    def add_listener(self, listener: Callable[[ScoringEvent], None]):
+        """Call `listener(event)` for every event published from now on."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    # --------------------------- Publishing ---------------------------
+    def _emit(self, events: List[ScoringEvent]):
+        # Called with the lock held, so concurrent publishers cannot reorder
+        self._history.extend(events)
+        for listener in self._listeners:
+            for event in events:
+                listener(event)
+        for subscriber in self._subscribers:
+            for event in events:
+                try:
+                    subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+                except RuntimeError:  # loop already closed
+                    pass
+
+    def publish_totals(
+        self,
+        totals: Dict[int, Dict[str, int]],
+        revisions: Optional[Dict[int, int]] = None,
+    ):
+        """
+        One compact event per student with new totals and college rank.
+        Commit callbacks may run in any order: totals whose revision
+        (student_totals.revision) is not newer than the last one published
+        for that student are dropped.
+        """
+        events = []
+        with self._lock:
+            for student_id, row in totals.items():
+                revision = revisions.get(student_id) if revisions else None
+                if revision is not None:
+                    if revision <= self._revisions.get(student_id, 0):
+                        continue
+                    self._revisions[student_id] = revision
+                self.version += 1
+                data = {field: row[field] for field in TOTAL_FIELDS if field in row}
+                data["rank"] = leaderboard_index.rank_of(student_id) if leaderboard_index.ready else None
+                events.append(ScoringEvent(self.version, "totals", student_id, data))
+            self._emit(events)
+
+    def publish_reset(self, reason: str):
+        """The whole board changed (weights, rebuild): clients should refetch."""
+        with self._lock:
+            self.version += 1
+            event = ScoringEvent(self.version, "reset", data={"reason": reason})
+            self._emit([event])
+
+    # --------------------------- Subscribing ---------------------------
+    def _replay(self, since: Optional[int]) -> Iterable[ScoringEvent]:
+        if since is None or since == self.version:
+            return []
+        # Ahead of us (the server restarted) or older than the history kept
+        if since > self.version or not self._history or since < self._history[0].version - 1:
+            return [ScoringEvent(self.version, "reset", data={"reason": "resume_gap"})]
+        return [event for event in self._history if event.version > since]
+
+    @asynccontextmanager
+    async def subscribe(self, since: Optional[int] = None):
+        """
+        Queue of events after `since` (missed ones are replayed first),
+        live until the context exits.
+        """
+        subscriber = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            for event in self._replay(since):
+                subscriber.queue.put_nowait(event)
+            self._subscribers.add(subscriber)
+        try:
+            yield subscriber.queue
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+
+scoring_events = ScoringEventBus()
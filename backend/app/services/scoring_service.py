@@ -1,52 +1,410 @@
 # app/services/scoring_service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Boolean, Integer, func, case, delete, literal_column, select, update, exists, or_
+from sqlalchemy.dialects.postgresql import insert
+from app.database import after_commit
+from app.models.admin_notification_status import AdminNotificationStatus
 from app.models.student_total import StudentTotal
-from app.models.point_transaction import PointTransaction
-from typing import Dict
+from app.models.point_transaction import PointTransaction, TransactionKind
+from app.services.daily_buckets import apply_bucket_deltas, rebuild_buckets, utc_day
+from app.services.department_rollup import (
+    add_student_change,
+    apply_department_deltas,
+    empty_delta,
+    refresh_department_totals,
+)
+from app.services.leaderboard_index import leaderboard_index, TOTAL_FIELDS
+from app.services.notifications import invalidate_unread_count
+from app.services.scoring_events import scoring_events
+from app.services.scoring_versions import mark_totals_changed
+from app.services.scoring_engine import (
+    POINT_CATEGORIES,
+    composite_sql,
+    get_weights,
+    weighted_composite,
+)
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
 
-# Categories to aggregate points
-POINT_CATEGORIES = ['academics', 'sports', 'cultural', 'technical', 'social']
+# PostgreSQL leaves xmax at 0 on a freshly inserted row version, so an
+# upsert's RETURNING can tell inserts from updates
+_WAS_INSERTED = literal_column("xmax = 0", Boolean).label("inserted")
+# RETURNING is not correlated by the ORM, so the lookup is spelled out
+_DEPARTMENT_OF_ROW = literal_column(
+    "(SELECT students.department_id FROM students WHERE students.id = student_totals.student_id)",
+    Integer,
+).label("department_id")
 
-def recalculate_student_totals(db: Session, student_id: int):
+def _locked_totals(db: Session, student_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """Stored totals of existing rows, locked until the transaction ends."""
+    table = StudentTotal.__table__
+    rows = db.execute(
+        select(table.c.student_id, *[table.c[field] for field in TOTAL_FIELDS])
+        .where(table.c.student_id.in_(list(student_ids)))
+        .order_by(table.c.student_id)
+        .with_for_update()
+    ).mappings()
+    return {row["student_id"]: {field: row[field] for field in TOTAL_FIELDS} for row in rows}
+
+def _upsert_totals(
+    db: Session,
+    rows: Dict[int, Dict[str, int]],
+    accumulate: bool,
+) -> Dict[int, Dict[str, int]]:
     """
-    Recalculate all point totals for a student based on current point transactions.
-    Totals are always up-to-date. Wins are computed dynamically in leaderboard queries.
+    Write {student_id: {field: value}} into student_totals with one multi-row
+    INSERT ... ON CONFLICT DO UPDATE. With accumulate=True the values are
+    added to the stored totals (col = col + delta), otherwise they replace them.
+    Either way composite_points is derived from the resulting category
+    values with the current weights.
+
+    The difference each row made is rolled up into department_totals in
+    the same transaction: one more upsert, over the departments touched.
+    The in-memory leaderboard is updated once the transaction commits, with
+    each row's new revision so a late callback cannot undo a newer one.
+    Returns the stored totals per student.
+    """
+    if not rows:
+        return {}
+
+    weights = get_weights(db, lock=True)
+    # Replaced rows need their old values for the department rollup;
+    # accumulated ones are worked out from the returned totals
+    previous = {} if accumulate else _locked_totals(db, rows.keys())
+    table = StudentTotal.__table__
+    # Rows are locked in student_id order, so concurrent batches touching
+    # the same students in a different order cannot deadlock
+    stmt = insert(table).values(
+        [
+            {"student_id": student_id, **row, "composite_points": weighted_composite(row, weights)}
+            for student_id, row in sorted(rows.items())
+        ]
+    )
+    if accumulate:
+        updates = {field: table.c[field] + stmt.excluded[field] for field in TOTAL_FIELDS}
+        updates["composite_points"] = composite_sql(
+            {category: updates[f"{category}_points"] for category in POINT_CATEGORIES},
+            weights,
+        )
+    else:
+        updates = {field: stmt.excluded[field] for field in TOTAL_FIELDS}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.student_id],
+        set_={**updates, "revision": table.c.revision + 1, "updated_at": func.now()},
+    ).returning(
+        table.c.student_id,
+        *[table.c[field] for field in TOTAL_FIELDS],
+        table.c.revision,
+        _DEPARTMENT_OF_ROW,
+        _WAS_INSERTED,
+    )
+
+    totals = {}
+    revisions = {}
+    departments: Dict[int, Dict[str, int]] = {}
+    for row in db.execute(stmt).mappings():
+        row = dict(row)
+        student_id = row.pop("student_id")
+        department_id = row.pop("department_id")
+        inserted = row.pop("inserted")
+        revisions[student_id] = row.pop("revision")
+        totals[student_id] = row
+        if department_id is None:
+            continue
+
+        if inserted:
+            old = None
+        elif accumulate:
+            old = {field: row[field] - rows[student_id].get(field, 0) for field in TOTAL_FIELDS}
+            old["composite_points"] = weighted_composite(old, weights)
+        else:
+            old = previous.get(student_id)
+        add_student_change(departments.setdefault(department_id, empty_delta()), row, old, inserted)
+    apply_department_deltas(db, departments)
+
+    def _publish():
+        for student_id, student_totals in totals.items():
+            leaderboard_index.apply_totals(student_id, student_totals, revisions[student_id])
+        scoring_events.publish_totals(totals, revisions)
+
+    after_commit(db, _publish)
+    return totals
+
+def _point_deltas(
+    transactions: Iterable[Tuple],
+    reverse: bool = False,
+) -> Tuple[Dict[int, Dict[str, int]], Dict[Tuple, List[int]]]:
+    """
+    Aggregate (student_id, category, points, is_win[, created_at])
+    transactions into per-student total deltas and per
+    (student_id, day, category) bucket deltas of [points, wins].
+    """
+    sign = -1 if reverse else 1
+    deltas: Dict[int, Dict[str, int]] = {}
+    buckets: Dict[Tuple, List[int]] = {}
+    for student_id, category, points, is_win, *created_at in transactions:
+        row = deltas.setdefault(student_id, {field: 0 for field in TOTAL_FIELDS})
+        if category in POINT_CATEGORIES:
+            row[f"{category}_points"] += sign * (points or 0)
+        if is_win:
+            row["wins"] += sign
+        if category is not None:
+            bucket = buckets.setdefault((student_id, utc_day(created_at[0] if created_at else None), category), [0, 0])
+            bucket[0] += sign * (points or 0)
+            bucket[1] += sign if is_win else 0
+    return deltas, buckets
+
+def apply_point_deltas(
+    db: Session,
+    transactions: Iterable[Tuple],
+    reverse: bool = False,
+) -> Dict[int, Dict[str, int]]:
+    """
+    Add a batch of (student_id, category, points, is_win) transactions to the
+    affected students' totals with one multi-row atomic upsert
+    (INSERT ... ON CONFLICT DO UPDATE SET col = col + delta), so the cost does
+    not depend on ledger size and concurrent awards cannot overwrite each
+    other. With reverse=True the transactions are taken back out.
+
+    The same deltas go to the daily buckets. A transaction may carry its
+    created_at as a fifth item (rows being deleted); without it the bucket
+    is today's, which is where a row inserted in this transaction lands.
+
+    Does not commit: the caller commits it together with the ledger change.
+    Returns the new totals per student.
+    """
+    deltas, buckets = _point_deltas(transactions, reverse)
+    apply_bucket_deltas(db, buckets)
+    return _upsert_totals(db, deltas, accumulate=True)
+
+def apply_point_delta(
+    db: Session,
+    student_id: int,
+    category: str,
+    delta: int,
+    is_win: bool = False,
+    reverse: bool = False,
+    created_at: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """
+    Single-transaction form of apply_point_deltas. Does not commit.
+    Returns the student's new totals.
+    """
+    totals = apply_point_deltas(db, [(student_id, category, delta, is_win, created_at)], reverse=reverse)
+    return totals[student_id]
+
+def delete_transactions(db: Session, *criteria) -> int:
+    """
+    Bulk-delete the point transactions matching `criteria` (and their admin
+    notifications), then take them back out of the totals and daily buckets
+    with batched upserts built from the deleted rows. A fixed number of
+    statements whatever the number of rows. Does not commit. Returns the number of rows deleted.
+    """
+    matching = select(PointTransaction.id).where(*criteria)
+    notifications = db.execute(
+        delete(AdminNotificationStatus)
+        .where(AdminNotificationStatus.point_transaction_id.in_(matching))
+        .execution_options(synchronize_session=False)
+    )
+    if notifications.rowcount:
+        invalidate_unread_count(db)
+    deleted = db.execute(
+        delete(PointTransaction)
+        .where(*criteria)
+        .returning(
+            PointTransaction.student_id,
+            PointTransaction.category,
+            PointTransaction.points,
+            PointTransaction.kind,
+            PointTransaction.created_at,
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    apply_point_deltas(
+        db,
+        [
+            (student_id, category, points, kind == TransactionKind.WINNER, created_at)
+            for student_id, category, points, kind, created_at in deleted
+        ],
+        reverse=True,
+    )
+    return len(deleted)
+
+def recalculate_totals_for_students(db: Session, student_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """
+    Rebuild the totals of several students from their ledgers: one grouped
+    query for every category sum and win count, one upsert for all rows.
+    Students left without transactions get zeroed totals. Their daily
+    buckets are regrouped from the ledger as well.
+
+    Does not commit: the caller commits it together with the ledger change.
     """
-    # Aggregate points per category
+    student_ids = list(dict.fromkeys(student_ids))
+    if not student_ids:
+        return {}
+
     results = (
         db.query(
+            PointTransaction.student_id,
             PointTransaction.category,
-            func.sum(PointTransaction.points).label("total_points")
+            func.sum(PointTransaction.points).label("total_points"),
+            func.sum(case((PointTransaction.kind == TransactionKind.WINNER, 1), else_=0)).label("wins")
         )
-        .filter(PointTransaction.student_id == student_id)
-        .group_by(PointTransaction.category)
+        .filter(PointTransaction.student_id.in_(student_ids))
+        .group_by(PointTransaction.student_id, PointTransaction.category)
         .all()
     )
 
-    # Initialize totals dict
-    totals: Dict[str, int] = {cat: 0 for cat in POINT_CATEGORIES}
-    composite_sum = 0
-
-    for category, total_points in results:
-        if category in totals:
-            totals[category] = total_points
-            composite_sum += total_points
-
-    # Get or create StudentTotal record
-    student_total = db.query(StudentTotal).filter(StudentTotal.student_id == student_id).first()
-    if not student_total:
-        student_total = StudentTotal(student_id=student_id)
-        db.add(student_total)
-
-    # Update totals
-    student_total.academics_points = totals['academics']
-    student_total.sports_points = totals['sports']
-    student_total.cultural_points = totals['cultural']
-    student_total.technical_points = totals['technical']
-    student_total.social_points = totals['social']
-    student_total.composite_points = composite_sum
-
-    # Commit changes
+    rows = {student_id: {field: 0 for field in TOTAL_FIELDS} for student_id in student_ids}
+    for student_id, category, total_points, wins in results:
+        row = rows[student_id]
+        row["wins"] += wins or 0
+        if category in POINT_CATEGORIES:
+            row[f"{category}_points"] = total_points or 0
+
+    rebuild_buckets(db, student_ids=student_ids)
+    return _upsert_totals(db, rows, accumulate=False)
+
+def recalculate_student_totals(db: Session, student_id: int):
+    """
+    Recalculate all point totals for a student based on current point transactions.
+    Totals are always up-to-date, including the number of wins.
+
+    Reads the whole ledger, so award paths use apply_point_delta; this stays
+    as the repair tool for totals that have drifted. Does not commit.
+    """
+    return recalculate_totals_for_students(db, [student_id])
+
+# --------------------------- Full rebuild / reconciliation ---------------------------
+
+def _ledger_totals_select(weights):
+    """
+    Per-student totals computed straight from point_transactions, with one
+    column per TOTAL_FIELDS entry.
+    """
+    pt = PointTransaction.__table__
+    category_sums = {
+        category: func.coalesce(func.sum(case((pt.c.category == category, pt.c.points))), 0)
+        for category in POINT_CATEGORIES
+    }
+    wins = func.coalesce(func.sum(case((pt.c.kind == TransactionKind.WINNER, 1), else_=0)), 0)
+    columns = {
+        **{f"{category}_points": value for category, value in category_sums.items()},
+        "composite_points": composite_sql(category_sums, weights),
+        "wins": wins,
+    }
+    return (
+        select(pt.c.student_id, *[columns[field].label(field) for field in TOTAL_FIELDS])
+        .where(pt.c.student_id.isnot(None))
+        .group_by(pt.c.student_id)
+    )
+
+def _student_id_ranges(db: Session, chunk_size: Optional[int]) -> List[Tuple[int, int]]:
+    """Inclusive student-id ranges covering the ledger and the stored totals."""
+    pt = PointTransaction.__table__
+    st = StudentTotal.__table__
+    bounds = [
+        db.execute(select(func.min(pt.c.student_id), func.max(pt.c.student_id))).one(),
+        db.execute(select(func.min(st.c.student_id), func.max(st.c.student_id))).one(),
+    ]
+    lows = [lo for lo, _ in bounds if lo is not None]
+    highs = [hi for _, hi in bounds if hi is not None]
+    if not lows:
+        return []
+    low, high = min(lows), max(highs)
+    if not chunk_size:
+        return [(low, high)]
+    return [(start, min(start + chunk_size - 1, high)) for start in range(low, high + 1, chunk_size)]
+
+def rebuild_all_totals(db: Session, chunk_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    Recompute every StudentTotal from the ledger with INSERT ... SELECT ...
+    GROUP BY student_id, one statement per student-id range (one range when
+    chunk_size is None). Totals whose ledger is now empty are zeroed.
+
+    Commits after each range so very large rebuilds keep short transactions,
+    then recomputes department_totals from the result in one more, which
+    also bumps the shared totals generation. The in-memory leaderboard
+    reloads on its next read, in this process and in any other server.
+    """
+    pt = PointTransaction.__table__
+    table = StudentTotal.__table__
+    rebuilt = zeroed = 0
+
+    for low, high in _student_id_ranges(db, chunk_size):
+        # Every range commits on its own, so each takes the weights afresh
+        weights = get_weights(db, lock=True)
+        ledger = _ledger_totals_select(weights).where(pt.c.student_id.between(low, high))
+        stmt = insert(table).from_select(["student_id", *TOTAL_FIELDS], ledger)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.student_id],
+            set_={
+                **{field: stmt.excluded[field] for field in TOTAL_FIELDS},
+                "revision": table.c.revision + 1,
+                "updated_at": func.now(),
+            },
+        )
+        rebuilt += db.execute(stmt).rowcount
+
+        has_ledger = exists().where(pt.c.student_id == table.c.student_id)
+        zeroed += db.execute(
+            update(table)
+            .where(
+                table.c.student_id.between(low, high),
+                ~has_ledger,
+                or_(*[table.c[field] != 0 for field in TOTAL_FIELDS]),
+            )
+            .values(**{field: 0 for field in TOTAL_FIELDS}, revision=table.c.revision + 1, updated_at=func.now())
+        ).rowcount
+        db.commit()
+
+    departments = refresh_department_totals(db)
+    # Servers other than this process (e.g. when run from the CLI) reload too
+    mark_totals_changed(db)
     db.commit()
-    db.refresh(student_total)
+
+    leaderboard_index.invalidate()
+    scoring_events.publish_reset("rebuild")
+    return {"rebuilt": rebuilt, "zeroed": zeroed, "departments": departments}
+
+def verify_all_totals(db: Session, chunk_size: int = 1000, max_report: int = 1000) -> dict:
+    """
+    Compare stored totals with the ledger without writing anything. Both
+    sides are read one student-id range at a time, so memory stays bounded.
+    Reports up to max_report drifted students with stored and expected values.
+    """
+    pt = PointTransaction.__table__
+    table = StudentTotal.__table__
+    weights = get_weights(db)
+    zero = {field: 0 for field in TOTAL_FIELDS}
+    checked = drifted_count = 0
+    drifted = []
+
+    for low, high in _student_id_ranges(db, chunk_size):
+        expected = {
+            row.student_id: {field: row._mapping[field] for field in TOTAL_FIELDS}
+            for row in db.execute(_ledger_totals_select(weights).where(pt.c.student_id.between(low, high)))
+        }
+        stored = {
+            row.student_id: {field: row._mapping[field] for field in TOTAL_FIELDS}
+            for row in db.execute(
+                select(table.c.student_id, *[table.c[field] for field in TOTAL_FIELDS])
+                .where(table.c.student_id.between(low, high))
+            )
+        }
+
+        for student_id in sorted(expected.keys() | stored.keys()):
+            want = expected.get(student_id, zero)
+            have = stored.get(student_id)
+            # A student with no ledger and no totals row is consistent
+            if have is None and student_id not in expected:
+                continue
+            checked += 1
+            if have != want:
+                drifted_count += 1
+                if len(drifted) < max_report:
+                    drifted.append({"student_id": student_id, "stored": have, "expected": want})
+        db.rollback()
+
+    return {"checked": checked, "drifted_count": drifted_count, "drifted": drifted}
@@ -0,0 +1,98 @@
+# app/services/scoring_versions.py
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.database import after_commit
+from app.models.scoring_version import ScoringVersion
+from app.services.leaderboard_index import leaderboard_index
+from app.services.scoring_events import scoring_events
+
+# Bumped by bulk totals changes (rebuilds, imports), whichever process ran them
+TOTALS = "totals"
+# Bumped by every change to scoring_weights
+WEIGHTS = "weights"
+
+# How often a server looks for totals changed by another process. Changes
+# made through this process are applied at once; this bounds the rest.
+TOTALS_CHECK_SECONDS = 2.0
+
+
+def bump_version(db: Session, name: str) -> int:
+    """
+    Add one to the named counter (creating it if missing) and return the
+    new value. The row stays locked until the transaction ends, so bumps
+    are serialized. Does not commit.
+    """
+    table = ScoringVersion.__table__
+    stmt = insert(table).values(name=name, version=1, updated_at=func.now())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.name],
+        set_={"version": table.c.version + 1, "updated_at": func.now()},
+    ).returning(table.c.version)
+    return db.execute(stmt).scalar_one()
+
+
+def read_version(db: Session, name: str, for_share: bool = False) -> int:
+    """
+    Current value of the named counter (0 if it was never bumped). With
+    for_share=True its row is locked FOR SHARE until the transaction ends,
+    so a bump waits for this transaction and cannot happen under it.
+    """
+    table = ScoringVersion.__table__
+    stmt = select(table.c.version).where(table.c.name == name)
+    if for_share:
+        stmt = stmt.with_for_update(read=True)
+    return db.execute(stmt).scalar() or 0
+
+
+# --------------------------- Totals generation ---------------------------
+_lock = threading.Lock()
+_seen_totals: Optional[int] = None
+_checked_at = 0.0
+
+
+def _saw_own_bump(generation: int):
+    global _seen_totals
+    with _lock:
+        # Only when nothing else moved it in between; otherwise the next
+        # check still has to reload
+        if _seen_totals == generation - 1:
+            _seen_totals = generation
+
+
+def mark_totals_changed(db: Session):
+    """
+    Record a bulk change to student_totals in the shared generation, with
+    the current transaction. Other processes pick it up on their next
+    check; this one applies the change itself and does not react to it.
+    Does not commit.
+    """
+    generation = bump_version(db, TOTALS)
+    after_commit(db, lambda: _saw_own_bump(generation))
+
+
+def check_totals_generation(db: Session, force: bool = False):
+    """
+    Pick up totals changed by another process (a CLI rebuild or import).
+    At most once per TOTALS_CHECK_SECONDS the shared generation is read;
+    if it moved, the in-memory leaderboard is dropped and a reset is
+    published, which also moves cached pages, ETags and streams on.
+    """
+    global _seen_totals, _checked_at
+    with _lock:
+        if not force and time.monotonic() - _checked_at < TOTALS_CHECK_SECONDS:
+            return
+        _checked_at = time.monotonic()
+
+    generation = read_version(db, TOTALS)
+    with _lock:
+        previous = _seen_totals
+        _seen_totals = generation
+    if previous is not None and generation != previous:
+        leaderboard_index.invalidate()
+        scoring_events.publish_reset("external")
@@ -0,0 +1,171 @@
+# app/services/simulation.py
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.student import Student
+from app.schemas import RankDelta, SimulatedAward, SimulationResponse
+from app.services.leaderboard_index import leaderboard_index
+from app.services.scoring_engine import TotalsSnapshot, Weights, get_weights
+
+
+# --------------------------- Snapshot ---------------------------
+def _current_snapshot(db: Session) -> Tuple[TotalsSnapshot, bool]:
+    """
+    Totals of every ranked student as column arrays. Returns (snapshot,
+    already_sorted): copied from the in-memory index it is in rank order,
+    so the baseline ranks are just positions.
+    """
+    leaderboard_index.ensure_loaded(db)
+    if leaderboard_index.ready:
+        snapshot = TotalsSnapshot()
+        for row in leaderboard_index.college():
+            snapshot.append(row.id, row.__dict__, row.created_at)
+        return snapshot, True
+    return TotalsSnapshot.from_db(db), False
+
+
+def _ranks(snapshot: TotalsSnapshot, composites: array) -> List[int]:
+    """1-based rank of every snapshot row under the leaderboard tie-break."""
+    ids = snapshot.student_ids
+    academics = snapshot.columns["academics_points"]
+    wins = snapshot.columns["wins"]
+    technical = snapshot.columns["technical_points"]
+    created = snapshot.created
+    order = sorted(
+        range(len(ids)),
+        key=lambda i: (-composites[i], -academics[i], -wins[i], -technical[i], created[i], ids[i]),
+    )
+    ranks = [0] * len(ids)
+    for rank, i in enumerate(order, start=1):
+        ranks[i] = rank
+    return ranks
+
+
+def _copy(snapshot: TotalsSnapshot) -> TotalsSnapshot:
+    clone = TotalsSnapshot()
+    clone.student_ids = array("q", snapshot.student_ids)
+    clone.columns = {field: array("q", column) for field, column in snapshot.columns.items()}
+    clone.created = array("d", snapshot.created)
+    return clone
+
+
+def _unranked_students(db: Session, student_ids: Iterable[int]) -> Dict[int, Tuple[str, object]]:
+    """{id: (name, created_at)} for existing students that have no totals row yet."""
+    student_ids = list(student_ids)
+    if leaderboard_index.ready:
+        found = {}
+        for student_id in student_ids:
+            row = leaderboard_index.get_student(student_id)
+            if row is not None:
+                found[student_id] = (row.name, row.created_at)
+        return found
+    if not student_ids:
+        return {}
+    rows = (
+        db.query(Student.id, Student.name, Student.created_at)
+        .filter(Student.id.in_(student_ids))
+        .all()
+    )
+    return {row.id: (row.name, row.created_at) for row in rows}
+
+
+def _names(db: Session, student_ids: List[int]) -> Dict[int, str]:
+    if leaderboard_index.ready:
+        return {
+            student_id: row.name
+            for student_id in student_ids
+            if (row := leaderboard_index.get_student(student_id)) is not None
+        }
+    if not student_ids:
+        return {}
+    return dict(db.query(Student.id, Student.name).filter(Student.id.in_(student_ids)).all())
+
+
+# --------------------------- Simulation ---------------------------
+def simulate_awards(
+    db: Session,
+    awards: List[SimulatedAward],
+    weights: Optional[Weights] = None,
+    limit: int = 100,
+) -> SimulationResponse:
+    """
+    What-if ranking: apply hypothetical awards (and optionally different
+    weights; the current ones by default) to an in-memory copy of the
+    cohort's totals and report how ranks would move. Nothing is written
+    to the database.
+
+    Returns every awarded student plus the other students whose rank
+    changes, largest moves first, capped at `limit`.
+    """
+    started = time.perf_counter()
+
+    weights = weights or get_weights(db)
+
+    baseline, in_order = _current_snapshot(db)
+    old_composites = baseline.columns["composite_points"]
+    if in_order:
+        old_ranks = list(range(1, len(baseline) + 1))
+    else:
+        old_ranks = _ranks(baseline, old_composites)
+
+    simulated = _copy(baseline)
+    position = {student_id: i for i, student_id in enumerate(simulated.student_ids)}
+
+    # Awarded students without a totals row join the board at zero.
+    unseen = {award.student_id for award in awards} - position.keys()
+    found = _unranked_students(db, unseen)
+    for student_id, (_, created_at) in found.items():
+        position[student_id] = len(simulated)
+        simulated.append(student_id, {}, created_at)
+    unknown = sorted(unseen - found.keys())
+
+    awarded = set()
+    for award in awards:
+        i = position.get(award.student_id)
+        if i is None:
+            continue
+        simulated.columns[f"{award.category}_points"][i] += award.points
+        if award.is_win:
+            simulated.columns["wins"][i] += 1
+        awarded.add(i)
+
+    new_composites = simulated.composites(weights)
+    new_ranks = _ranks(simulated, new_composites)
+
+    moved = [
+        i for i in range(len(simulated))
+        if i in awarded or i >= len(baseline) or new_ranks[i] != old_ranks[i]
+    ]
+    changed = sum(1 for i in moved if i >= len(baseline) or new_ranks[i] != old_ranks[i])
+
+    def _move(i: int) -> int:
+        return old_ranks[i] - new_ranks[i] if i < len(baseline) else len(simulated) - new_ranks[i]
+
+    moved.sort(key=lambda i: (i not in awarded, -abs(_move(i)), new_ranks[i]))
+    moved = moved[:limit]
+
+    names = _names(db, [simulated.student_ids[i] for i in moved])
+    deltas = []
+    for i in moved:
+        student_id = simulated.student_ids[i]
+        ranked_before = i < len(baseline)
+        deltas.append(RankDelta(
+            student_id=student_id,
+            name=names.get(student_id),
+            old_rank=old_ranks[i] if ranked_before else None,
+            new_rank=new_ranks[i],
+            rank_change=_move(i),
+            old_composite=old_composites[i] if ranked_before else 0,
+            new_composite=new_composites[i],
+        ))
+
+    return SimulationResponse(
+        cohort_size=len(simulated),
+        changed=changed,
+        deltas=deltas,
+        unknown_students=unknown,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
@@ -0,0 +1,7 @@
+# tests/conftest.py
+# Unit tests for the pure-Python parts of the backend; none needs a
+# database. Run from the backend directory:  python -m pytest -q
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,64 @@
+# tests/test_cursors.py
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from app.services.leaderboard_index import RankedStudent, ranking_key
+from app.services.leaderboard_service import decode_cursor, encode_cursor
+
+
+def _row(**totals):
+    return RankedStudent(
+        id=7,
+        student_id="R7",
+        name="S7",
+        year=2,
+        department_id=1,
+        created_at=totals.pop("created_at", datetime(2025, 1, 3, 9, 30)),
+        **totals,
+    )
+
+
+def _cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_round_trip_keeps_tie_break_values_and_rank():
+    row = _row(composite_points=40, academics_points=12, wins=2, technical_points=5)
+    values, rank = decode_cursor(encode_cursor(row, 17))
+
+    assert rank == 17
+    assert values == [40, 12, 2, 5, datetime(2025, 1, 3, 9, 30), 7]
+    assert ranking_key(*values) == row.key
+
+
+def test_missing_registration_time_sorts_last():
+    row = _row(composite_points=3, created_at=None)
+    values, _ = decode_cursor(encode_cursor(row, 1))
+
+    assert values[4] == datetime.max
+    assert ranking_key(*values) == row.key
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-base64!",
+        _cursor([1, 2, 3]),
+        _cursor({"composite": 1}),
+        _cursor(["x", 0, 0, 0, None, 1, 1]),
+        _cursor([1, 0, 0, 0, "yesterday", 1, 1]),
+    ],
+)
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_timezone_aware_registration_time_is_rejected():
+    # Index keys hold naive datetimes; comparing them would raise TypeError
+    cursor = _cursor([1, 0, 0, 0, "2025-01-01T00:00:00+02:00", 3, 4])
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
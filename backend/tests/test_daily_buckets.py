@@ -0,0 +1,50 @@
+# tests/test_daily_buckets.py
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.services.daily_buckets import MAX_WINDOW_DAYS, resolve_window, utc_day
+
+TODAY = date(2025, 3, 10)
+
+
+@pytest.mark.parametrize("window, first", [("7d", date(2025, 3, 4)), ("30d", date(2025, 2, 9))])
+def test_named_windows_end_today(window, first):
+    start, end = resolve_window(window, today=TODAY)
+
+    assert (start, end) == (first, TODAY)
+    assert (end - start).days + 1 == int(window[:-1])
+
+
+def test_custom_window_defaults_its_end_to_today():
+    assert resolve_window("custom", start=date(2025, 3, 1), today=TODAY) == (date(2025, 3, 1), TODAY)
+    assert resolve_window("custom", start=TODAY, end=TODAY, today=TODAY) == (TODAY, TODAY)
+
+
+def test_custom_window_may_span_the_maximum():
+    start = TODAY - timedelta(days=MAX_WINDOW_DAYS - 1)
+
+    assert resolve_window("custom", start=start, end=TODAY) == (start, TODAY)
+
+
+@pytest.mark.parametrize(
+    "window, start, end",
+    [
+        ("1y", None, None),
+        ("7d", date(2025, 3, 1), None),
+        ("custom", None, TODAY),
+        ("custom", TODAY, TODAY - timedelta(days=1)),
+        ("custom", TODAY - timedelta(days=MAX_WINDOW_DAYS), TODAY),
+    ],
+)
+def test_invalid_windows(window, start, end):
+    with pytest.raises(ValueError):
+        resolve_window(window, start, end, today=TODAY)
+
+
+def test_utc_day():
+    assert utc_day(None) is None
+    assert utc_day(datetime(2025, 3, 10, 23, 59)) == date(2025, 3, 10)
+    # 01:30 at UTC+2 is still the previous day in UTC
+    assert utc_day(datetime(2025, 3, 10, 1, 30, tzinfo=timezone(timedelta(hours=2)))) == date(2025, 3, 9)
+    assert utc_day(datetime(2025, 3, 10, 22, 0, tzinfo=timezone(timedelta(hours=-5)))) == date(2025, 3, 11)
@@ -0,0 +1,91 @@
+# tests/test_department_rollup.py
+from app.services.department_rollup import ROLLUP_FIELDS, add_student_change, empty_delta
+from app.services.leaderboard_index import TOTAL_FIELDS
+from app.services.leaderboard_service import _rank_departments
+
+
+def _totals(composite, wins=0):
+    totals = {field: 0 for field in TOTAL_FIELDS}
+    totals.update(sports_points=composite, composite_points=composite, wins=wins)
+    return totals
+
+
+def _department(department_id, name, composite, student_count):
+    row = {field: 0 for field in ROLLUP_FIELDS}
+    row.update(id=department_id, name=name, composite_points=composite, student_count=student_count)
+    return row
+
+
+def _ranking(rows, by):
+    return [(entry.rank, entry.name) for entry in _rank_departments(rows, by)]
+
+
+# --------------------------- Rollup deltas ---------------------------
+def test_new_student_is_counted_with_their_totals():
+    delta = empty_delta()
+
+    add_student_change(delta, _totals(10, wins=1), None, inserted=True)
+
+    assert delta["composite_points"] == 10
+    assert delta["wins"] == 1
+    assert delta["student_count"] == 1
+
+
+def test_changed_student_adds_the_difference():
+    delta = empty_delta()
+
+    add_student_change(delta, _totals(25), _totals(10, wins=1))
+    add_student_change(delta, _totals(3), _totals(8))
+
+    assert delta["composite_points"] == 25 - 10 + 3 - 8
+    assert delta["sports_points"] == delta["composite_points"]
+    assert delta["wins"] == -1
+    assert delta["student_count"] == 0
+
+
+def test_unchanged_student_leaves_an_empty_delta():
+    delta = empty_delta()
+
+    add_student_change(delta, _totals(7, wins=2), _totals(7, wins=2))
+
+    assert not any(delta.values())
+
+
+# --------------------------- Department cup ---------------------------
+def test_average_ties_share_a_rank():
+    rows = [
+        _department(1, "Civil", 30, 3),
+        _department(2, "Arts", 20, 2),
+        _department(3, "Maths", 50, 2),
+        _department(4, "Physics", 9, 1),
+    ]
+
+    assert _ranking(rows, "average") == [(1, "Maths"), (2, "Arts"), (2, "Civil"), (4, "Physics")]
+
+
+def test_averages_compare_exactly():
+    # 1/3 and 2/6 are equal; as floats they need not be
+    rows = [_department(1, "B", 1, 3), _department(2, "A", 2, 6)]
+
+    assert _ranking(rows, "average") == [(1, "A"), (1, "B")]
+
+
+def test_total_ranks_by_composite_sum():
+    rows = [_department(1, "Small", 90, 1), _department(2, "Large", 100, 10)]
+
+    assert _ranking(rows, "total") == [(1, "Large"), (2, "Small")]
+    assert _ranking(rows, "average") == [(1, "Small"), (2, "Large")]
+
+
+def test_empty_departments_come_last_tied():
+    rows = [
+        _department(1, "Empty B", 0, 0),
+        _department(2, "Negative", -5, 1),
+        _department(3, "Empty A", 0, 0),
+    ]
+
+    entries = _rank_departments(rows, "average")
+
+    assert [(entry.rank, entry.name) for entry in entries] == [(1, "Negative"), (2, "Empty A"), (2, "Empty B")]
+    assert entries[1].average_composite == 0.0
+    assert entries[0].average_composite == -5.0
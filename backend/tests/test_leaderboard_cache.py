@@ -0,0 +1,108 @@
+# tests/test_leaderboard_cache.py
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import leaderboard_cache
+from app.services.leaderboard_cache import TopKCache
+from app.services.leaderboard_index import RankedStudent
+
+
+def _student(student_id, composite):
+    return RankedStudent(
+        id=student_id,
+        student_id=f"R{student_id}",
+        name=f"S{student_id}",
+        year=1,
+        department_id=1,
+        created_at=datetime(2025, 1, student_id),
+        composite_points=composite,
+    )
+
+
+@pytest.fixture
+def students(monkeypatch):
+    """Stored rows the cache falls back to for students outside its list."""
+    rows = {student_id: _student(student_id, 10 * student_id) for student_id in range(1, 8)}
+    monkeypatch.setattr(leaderboard_cache, "leaderboard_index", SimpleNamespace(get_student=rows.get))
+    return rows
+
+
+def _cache(students, size, ids):
+    cache = TopKCache(size)
+    cache._rows = sorted((students[i] for i in ids), key=lambda row: row.key)
+    return cache
+
+
+def _ids(cache):
+    return None if cache._rows is None else [row.id for row in cache._rows]
+
+
+def test_member_update_reorders_the_list(students):
+    cache = _cache(students, 3, [5, 6, 7])
+
+    cache._apply(5, {"composite_points": 100})
+
+    assert _ids(cache) == [5, 7, 6]
+    assert cache.generation == 1
+
+
+def test_outsider_below_the_kth_changes_nothing(students):
+    cache = _cache(students, 3, [5, 6, 7])
+    cache._bodies[3] = b"cached"
+
+    cache._apply(1, {"composite_points": 49})
+
+    assert _ids(cache) == [7, 6, 5]
+    assert cache.generation == 0
+    assert cache._bodies == {3: b"cached"}
+
+
+def test_outsider_passing_the_kth_moves_in(students):
+    cache = _cache(students, 3, [5, 6, 7])
+
+    cache._apply(2, {"composite_points": 65})
+
+    assert _ids(cache) == [7, 2, 6]
+
+
+def test_member_falling_out_empties_the_list(students):
+    # Who takes the freed place is not known without the database
+    cache = _cache(students, 3, [5, 6, 7])
+
+    cache._apply(6, {"composite_points": 1})
+
+    assert _ids(cache) is None
+
+
+def test_short_list_takes_anyone(students):
+    cache = _cache(students, 5, [6, 7])
+
+    cache._apply(1, {"composite_points": 0})
+
+    assert _ids(cache) == [7, 6, 1]
+
+
+def test_unknown_student_empties_the_list(students):
+    cache = _cache(students, 3, [5, 6, 7])
+
+    cache._apply(99, {"composite_points": 500})
+
+    assert _ids(cache) is None
+
+
+def test_update_during_a_fill_discards_it(students, monkeypatch):
+    cache = TopKCache(3)
+
+    def fill(db, k):
+        cache._apply(7, {"composite_points": 1})
+        return [(students[i], "CS") for i in (7, 6, 5)]
+
+    monkeypatch.setattr(leaderboard_cache, "get_top_rows", fill)
+    cache._ensure(db=None)
+    assert _ids(cache) is None
+
+    monkeypatch.setattr(leaderboard_cache, "get_top_rows", lambda db, k: [(students[i], "CS") for i in (7, 6, 5)])
+    cache._ensure(db=None)
+    assert _ids(cache) == [7, 6, 5]
@@ -0,0 +1,202 @@
+# tests/test_leaderboard_index.py
+from datetime import datetime
+
+import pytest
+
+from app.services import leaderboard_index as index_module
+from app.services.leaderboard_index import LeaderboardIndex, RankedStudent
+from app.services.scoring_events import ScoringEventBus
+
+
+class _Departments:
+    """Stands in for the session: load() only asks it for department names."""
+
+    def query(self, *columns):
+        return self
+
+    def all(self):
+        return [(1, "CS"), (2, "EE")]
+
+
+def _student(student_id, composite, department_id=1, year=1, revision=1):
+    return RankedStudent(
+        id=student_id,
+        student_id=f"R{student_id}",
+        name=f"S{student_id}",
+        year=year,
+        department_id=department_id,
+        created_at=datetime(2025, 1, student_id),
+        sports_points=composite,
+        composite_points=composite,
+        revision=revision,
+    )
+
+
+def _loaded(monkeypatch, students, during_load=None):
+    index = LeaderboardIndex()
+
+    def rows(db):
+        if during_load:
+            during_load(index)
+        return [(student, True) for student in students]
+
+    monkeypatch.setattr(index_module, "_student_rows", rows)
+    index.load(_Departments())
+    return index
+
+
+def _totals(composite):
+    return {"sports_points": composite, "composite_points": composite}
+
+
+def _order(index):
+    return [row.id for row in index.college()]
+
+
+def test_load_ranks_by_composite(monkeypatch):
+    index = _loaded(monkeypatch, [_student(1, 10), _student(2, 30), _student(3, 20)])
+
+    assert _order(index) == [2, 3, 1]
+    assert index.rank_of(3) == 2
+    assert index.department_name(2) == "EE"
+
+
+def test_newer_revision_moves_the_student(monkeypatch):
+    index = _loaded(monkeypatch, [_student(1, 10), _student(2, 30)])
+
+    index.apply_totals(1, _totals(50), revision=2)
+
+    assert _order(index) == [1, 2]
+    assert index.get_student(1).revision == 2
+
+
+def test_older_revision_arriving_late_is_ignored(monkeypatch):
+    # Commit callbacks may run in any order
+    index = _loaded(monkeypatch, [_student(1, 10), _student(2, 30)])
+
+    index.apply_totals(1, _totals(50), revision=3)
+    index.apply_totals(1, _totals(20), revision=2)
+    index.apply_totals(1, _totals(40), revision=3)
+
+    assert index.get_student(1).composite_points == 50
+    assert _order(index) == [1, 2]
+
+
+def test_unknown_student_marks_the_index_stale(monkeypatch):
+    index = _loaded(monkeypatch, [_student(1, 10)])
+
+    index.apply_totals(99, _totals(5), revision=1)
+
+    assert not index.ready
+
+
+def test_apply_many_keeps_newer_rows(monkeypatch):
+    index = _loaded(monkeypatch, [_student(1, 10), _student(2, 20), _student(3, 30, revision=5)])
+
+    index.apply_many(
+        {1: _totals(100), 2: _totals(0), 3: _totals(1)},
+        {1: 2, 2: 2, 3: 4},
+    )
+
+    assert _order(index) == [1, 3, 2]
+    assert index.get_student(3).composite_points == 30
+
+
+def test_updates_during_a_load_are_replayed(monkeypatch):
+    # A commit landing after the load read the table, before the swap
+    def commit_during_load(index):
+        index.apply_totals(1, _totals(99), revision=2)
+
+    index = _loaded(monkeypatch, [_student(1, 10), _student(2, 30)], commit_during_load)
+
+    assert index.ready
+    assert _order(index) == [1, 2]
+    assert index.get_student(1).composite_points == 99
+
+
+def test_replayed_update_already_in_the_load_is_ignored(monkeypatch):
+    def stale_callback(index):
+        index.apply_totals(1, _totals(5), revision=1)
+
+    index = _loaded(monkeypatch, [_student(1, 10, revision=2)], stale_callback)
+
+    assert index.get_student(1).composite_points == 10
+
+
+def test_invalidate_during_a_load_leaves_it_stale(monkeypatch):
+    index = _loaded(monkeypatch, [_student(1, 10)], lambda index: index.invalidate())
+
+    assert not index.ready
+
+
+def test_standing_reports_every_board(monkeypatch):
+    index = _loaded(
+        monkeypatch,
+        [
+            _student(1, 40, department_id=1, year=1),
+            _student(2, 30, department_id=2, year=1),
+            _student(3, 20, department_id=1, year=2),
+            _student(4, 10, department_id=None, year=2),
+        ],
+    )
+
+    standing = index.standing(3, k=1)
+
+    assert standing["positions"] == {"college": (3, 4), "department": (2, 2), "year": (1, 2)}
+    assert [row.id for row in standing["above"]] == [2]
+    assert [row.id for row in standing["below"]] == [4]
+    assert index.standing(4)["positions"]["department"] == (1, 1)
+
+
+def test_page_follows_the_key_after():
+    index = LeaderboardIndex()
+    for student in [_student(i, 10 * i) for i in range(1, 6)]:
+        index._students[student.id] = student
+        index._ranked[student.id] = student.key
+    index._rebuild_lists()
+    index.ready = True
+
+    first_rank, rows = index.page(None, 2)
+    assert (first_rank, [row.id for row in rows]) == (1, [5, 4])
+    first_rank, rows = index.page(rows[-1].key, 2)
+    assert (first_rank, [row.id for row in rows]) == (3, [3, 2])
+
+
+# --------------------------- Event bus ---------------------------
+def test_bus_drops_totals_older_than_the_last_published():
+    bus = ScoringEventBus()
+    seen = []
+    bus.add_listener(lambda event: seen.append((event.version, event.student_id, event.data["composite_points"])))
+
+    bus.publish_totals({1: {"composite_points": 50}}, {1: 3})
+    bus.publish_totals({1: {"composite_points": 20}, 2: {"composite_points": 7}}, {1: 2, 2: 1})
+    bus.publish_totals({1: {"composite_points": 60}}, {1: 4})
+
+    assert seen == [(1, 1, 50), (2, 2, 7), (3, 1, 60)]
+    assert bus.version == 3
+
+
+def test_bus_without_revisions_publishes_everything():
+    bus = ScoringEventBus()
+    bus.publish_totals({1: {"composite_points": 1}})
+    bus.publish_totals({1: {"composite_points": 1}})
+    bus.publish_reset("weights")
+
+    assert bus.version == 3
+    assert [event.kind for event in bus._history] == ["totals", "totals", "reset"]
+
+
+@pytest.mark.parametrize("since, expected", [(None, []), (3, []), (1, [2, 3])])
+def test_bus_replays_missed_events(since, expected):
+    bus = ScoringEventBus()
+    for student_id in (1, 2, 3):
+        bus.publish_totals({student_id: {"composite_points": student_id}})
+
+    assert [event.version for event in bus._replay(since)] == expected
+
+
+def test_bus_resets_clients_ahead_of_it():
+    bus = ScoringEventBus()
+    bus.publish_reset("weights")
+
+    assert [event.kind for event in bus._replay(10)] == ["reset"]
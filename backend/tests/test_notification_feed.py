@@ -0,0 +1,99 @@
+# tests/test_notification_feed.py
+import asyncio
+import threading
+import time
+
+from app.routers import events
+from app.services.notifications import NotificationFeed
+
+
+class _Session:
+    def close(self):
+        pass
+
+
+def _page(entries, after_id):
+    return {
+        "entries": entries,
+        "next_after_id": entries[0]["id"] if entries else after_id,
+        "unread_count": len(entries),
+    }
+
+
+def test_wait_wakes_on_publish_from_another_thread():
+    feed = NotificationFeed()
+
+    async def scenario():
+        generation = feed.generation
+        threading.Timer(0.05, feed.publish).start()
+        return await feed.wait(generation, 5)
+
+    started = time.monotonic()
+    assert asyncio.run(scenario()) is True
+    assert time.monotonic() - started < 2
+
+
+def test_publish_before_the_wait_is_not_missed():
+    feed = NotificationFeed()
+    generation = feed.generation
+    feed.publish()
+
+    assert asyncio.run(feed.wait(generation, 5)) is True
+
+
+def test_wait_times_out_without_a_publish():
+    feed = NotificationFeed()
+
+    assert asyncio.run(feed.wait(feed.generation, 0.05)) is False
+
+
+def test_feed_returns_rows_committed_during_the_wait(monkeypatch):
+    feed = NotificationFeed()
+    rows = []
+    monkeypatch.setattr(events, "notification_feed", feed)
+    monkeypatch.setattr(events, "_feed_page", lambda db, after_id, limit: _page(list(rows), after_id))
+
+    def commit():
+        rows.append({"id": 8})
+        feed.publish()
+
+    async def scenario():
+        threading.Timer(0.05, commit).start()
+        return await events.get_notification_feed(after_id=7, wait=5, limit=20, db=_Session(), admin_user=None)
+
+    page = asyncio.run(scenario())
+
+    assert page["entries"] == [{"id": 8}]
+    assert page["next_after_id"] == 8
+
+
+def test_wake_up_without_new_rows_keeps_waiting(monkeypatch):
+    # The newest participation was deleted: publishes keep coming, nothing
+    # is after the cursor, and the request must not spin
+    feed = NotificationFeed()
+    queries = []
+    monkeypatch.setattr(events, "notification_feed", feed)
+    monkeypatch.setattr(events, "_feed_page", lambda db, after_id, limit: queries.append(after_id) or _page([], after_id))
+    feed.publish()
+
+    async def scenario():
+        threading.Timer(0.05, feed.publish).start()
+        return await events.get_notification_feed(after_id=7, wait=0.3, limit=20, db=_Session(), admin_user=None)
+
+    started = time.monotonic()
+    page = asyncio.run(scenario())
+
+    assert time.monotonic() - started >= 0.3
+    assert page == _page([], 7)
+    assert len(queries) <= 3
+
+
+def test_no_cursor_or_no_wait_answers_at_once(monkeypatch):
+    monkeypatch.setattr(events, "notification_feed", NotificationFeed())
+    monkeypatch.setattr(events, "_feed_page", lambda db, after_id, limit: _page([], after_id))
+
+    started = time.monotonic()
+    asyncio.run(events.get_notification_feed(after_id=None, wait=5, limit=20, db=_Session(), admin_user=None))
+    asyncio.run(events.get_notification_feed(after_id=3, wait=0, limit=20, db=_Session(), admin_user=None))
+
+    assert time.monotonic() - started < 1
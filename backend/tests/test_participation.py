@@ -0,0 +1,47 @@
+# tests/test_participation.py
+from sqlalchemy.dialects import postgresql
+
+from app.models.point_transaction import PointTransaction, TransactionKind
+from app.services.participation import _registration_statement
+
+
+def _compiled(student_id=7, event_id=3):
+    return _registration_statement(student_id, event_id).compile(dialect=postgresql.dialect())
+
+
+def _participation_index():
+    return next(
+        index for index in PointTransaction.__table__.indexes if index.name == "uq_point_transactions_participation"
+    )
+
+
+def test_participation_insert_targets_the_partial_unique_index():
+    sql = str(_compiled())
+    index = _participation_index()
+
+    columns = ", ".join(column.name for column in index.columns)
+    predicate = index.dialect_options["postgresql"]["where"].compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    assert index.unique
+    assert str(predicate).endswith(f"kind = {int(TransactionKind.PARTICIPATION)}")
+    assert f"ON CONFLICT ({columns}) WHERE kind = {int(TransactionKind.PARTICIPATION)} DO NOTHING" in sql
+
+
+def test_everything_happens_in_one_statement():
+    sql = str(_compiled())
+
+    assert sql.startswith("WITH participation AS")
+    for name in ("notification AS", "totals AS", "department AS"):
+        assert name in sql
+    # Totals and notifications are only written for a participation row
+    # that was actually inserted
+    assert "FROM participation ON CONFLICT (student_id) DO NOTHING" in sql
+    assert "FROM participation RETURNING admin_notification_status.id" in sql
+
+
+def test_ids_are_bound():
+    params = _compiled(student_id=11, event_id=5).params
+
+    assert 11 in params.values()
+    assert 5 in params.values()
@@ -0,0 +1,58 @@
+# tests/test_point_deltas.py
+from datetime import date, datetime
+
+from app.services.scoring_service import _point_deltas
+
+
+def test_batch_is_aggregated_per_student():
+    deltas, _ = _point_deltas(
+        [
+            (1, "sports", 10, True),
+            (1, "sports", 5, False),
+            (1, "academics", 7, False),
+            (2, "cultural", 3, True),
+        ]
+    )
+
+    assert set(deltas) == {1, 2}
+    assert deltas[1]["sports_points"] == 15
+    assert deltas[1]["academics_points"] == 7
+    assert deltas[1]["wins"] == 1
+    assert deltas[2]["cultural_points"] == 3
+    assert deltas[2]["sports_points"] == 0
+
+
+def test_reverse_takes_the_same_amounts_back_out():
+    transactions = [(1, "technical", 8, True), (1, "social", 2, False)]
+
+    forward, _ = _point_deltas(transactions)
+    backward, _ = _point_deltas(transactions, reverse=True)
+
+    assert backward[1] == {field: -value for field, value in forward[1].items()}
+
+
+def test_missing_points_and_unknown_categories():
+    deltas, buckets = _point_deltas([(1, "sports", None, True), (1, None, 4, True), (1, "chess", 9, False)])
+
+    assert deltas[1]["wins"] == 2
+    assert sum(value for field, value in deltas[1].items() if field != "wins") == 0
+    # Without a category there is no bucket to put it in
+    assert [key[2] for key in buckets] == ["sports", "chess"]
+
+
+def test_buckets_follow_the_transaction_day():
+    _, buckets = _point_deltas(
+        [
+            (1, "sports", 10, True, datetime(2025, 3, 1, 23, 30)),
+            (1, "sports", 5, False, datetime(2025, 3, 1, 8, 0)),
+            (1, "sports", 2, False, datetime(2025, 3, 2, 0, 5)),
+            (1, "sports", 1, False),
+        ],
+        reverse=True,
+    )
+
+    assert buckets == {
+        (1, date(2025, 3, 1), "sports"): [-15, -1],
+        (1, date(2025, 3, 2), "sports"): [-2, 0],
+        (1, None, "sports"): [-1, 0],
+    }
@@ -0,0 +1,87 @@
+# tests/test_scoring_engine.py
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.scoring_engine import (
+    DEFAULT_WEIGHTS,
+    POINT_CATEGORIES,
+    CategoryWeight,
+    TotalsSnapshot,
+    _round_scaled,
+    merge_weights,
+    weighted_composite,
+)
+
+
+def _points(**values):
+    return {f"{category}_points": values.get(category, 0) for category in POINT_CATEGORIES}
+
+
+def _weights(**overrides):
+    weights = dict(DEFAULT_WEIGHTS)
+    weights.update(overrides)
+    return weights
+
+
+def _update(category, weight, cap=None):
+    return SimpleNamespace(category=category, weight=weight, cap=cap)
+
+
+def test_default_weights_are_the_plain_sum():
+    assert weighted_composite(_points(academics=10, sports=20, social=3), DEFAULT_WEIGHTS) == 33
+
+
+def test_weights_and_caps():
+    weights = _weights(sports=CategoryWeight(2.0, 30), academics=CategoryWeight(0.5))
+
+    assert weighted_composite(_points(academics=10, sports=50, cultural=1), weights) == 5 + 60 + 1
+
+
+@pytest.mark.parametrize("weight, points, expected", [(0.5, 5, 3), (0.5, -5, -3), (0.25, 2, 1), (0.1, 4, 0)])
+def test_rounding_is_half_away_from_zero(weight, points, expected):
+    assert weighted_composite(_points(sports=points), _weights(sports=CategoryWeight(weight))) == expected
+
+
+def test_fractional_weights_are_exact():
+    # Weights are scaled to integers, so 0.1 * 45 is exactly 4.5 and rounds up
+    weights = _weights(**{category: CategoryWeight(0.1) for category in POINT_CATEGORIES})
+
+    assert weighted_composite(_points(academics=3, sports=3, cultural=3, technical=3, social=33), weights) == 5
+
+
+@pytest.mark.parametrize("total, scale, expected", [(149, 100, 1), (150, 100, 2), (-150, 100, -2), (0, 10, 0)])
+def test_round_scaled(total, scale, expected):
+    assert _round_scaled(total, scale) == expected
+
+
+def test_merge_weights_keeps_unlisted_categories():
+    current = _weights(cultural=CategoryWeight(3.0))
+
+    merged = merge_weights(current, [_update("sports", 1.5, 40)])
+
+    assert merged["sports"] == CategoryWeight(1.5, 40)
+    assert merged["cultural"] == CategoryWeight(3.0)
+    assert current["sports"] == CategoryWeight()
+
+
+@pytest.mark.parametrize(
+    "update",
+    [_update("chess", 1.0), _update("sports", -1.0), _update("sports", 1.0, -5)],
+)
+def test_merge_weights_rejects_invalid_items(update):
+    with pytest.raises(ValueError):
+        merge_weights(DEFAULT_WEIGHTS, [update])
+
+
+@pytest.mark.parametrize(
+    "weights",
+    [DEFAULT_WEIGHTS, _weights(sports=CategoryWeight(1.5, 30), technical=CategoryWeight(0.25))],
+)
+def test_snapshot_composites_match_the_row_formula(weights):
+    snapshot = TotalsSnapshot()
+    rows = [_points(sports=45, technical=3), _points(academics=7, sports=10), _points()]
+    for student_id, row in enumerate(rows, start=1):
+        snapshot.append(student_id, row, None)
+
+    assert list(snapshot.composites(weights)) == [weighted_composite(row, weights) for row in rows]
@@ -8,7 +8,7 @@ const API = axios.create({
 export const getLeaderboard = async () => {
   try {
     const response = await API.get("/api/leaderboard/"); // <-- add /api
-    return response.data;
+    return response.data.entries; // paginated: { entries, next_cursor }
   } catch (error) {
     console.error("Error fetching leaderboard:", error);
     return [];
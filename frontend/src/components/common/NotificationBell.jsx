@@ -11,34 +11,46 @@ function NotificationBell() {
   const isAdmin = user?.role === "admin";
 
   // ------------------------
-  // Fetch notifications
+  // Long-poll the notification feed: the server holds each request
+  // until a new participation arrives (or ~25s pass)
   // ------------------------
-  const fetchNotifications = async () => {
+  useEffect(() => {
     if (!token || !isAdmin) return;
 
-    console.log("Fetching notifications with token:", token);
-    console.log("User:", user);
-    console.log("Is admin?", isAdmin);
-
-    try {
-      const res = await axios.get(
-        "http://localhost:8000/api/events/participation_logs",
-        {
-          headers: { Authorization: `Bearer ${token}` },
+    let cancelled = false;
+    let afterId = null;
+
+    const poll = async () => {
+      while (!cancelled) {
+        try {
+          const res = await axios.get(
+            "http://localhost:8000/api/events/notifications/feed",
+            {
+              params: afterId === null ? {} : { after_id: afterId, wait: 25 },
+              headers: { Authorization: `Bearer ${token}` },
+            }
+          );
+          if (cancelled) return;
+
+          const { entries, next_after_id, unread_count } = res.data;
+          if (entries.length) {
+            setNotifications((prev) => [...entries, ...prev].slice(0, 20));
+          }
+          afterId = next_after_id ?? 0;
+          setUnreadCount(unread_count);
+        } catch (err) {
+          console.error("Error fetching notifications:", err);
+          // Back off before retrying after a failure
+          await new Promise((resolve) => setTimeout(resolve, 10000));
         }
-      );
+      }
+    };
 
-      const logs = res.data;
-      setNotifications(logs);
-
-      const count = logs.filter((n) => !n.seen).length;
-      setUnreadCount(count);
-
-      console.log("Notifications fetched:", logs);
-    } catch (err) {
-      console.error("Error fetching notifications:", err);
-    }
-  };
+    poll();
+    return () => {
+      cancelled = true;
+    };
+  }, [token, isAdmin]);
 
   // ------------------------
   // Mark notifications as seen
@@ -49,10 +61,18 @@ function NotificationBell() {
     console.log("Marking notifications as seen with token:", token);
 
     try {
+      // Only acknowledge what has been shown; newer alerts stay unread
+      const upToId = notifications.length
+        ? Math.max(...notifications.map((n) => n.id))
+        : undefined;
+
       const res = await axios.patch(
         "http://localhost:8000/api/events/notifications/mark_seen",
         {},
-        { headers: { Authorization: `Bearer ${token}` } }
+        {
+          params: { up_to_id: upToId },
+          headers: { Authorization: `Bearer ${token}` },
+        }
       );
 
       setUnreadCount(0);
@@ -62,17 +82,6 @@ function NotificationBell() {
     }
   };
 
-  // ------------------------
-  // Auto-refresh
-  // ------------------------
-  useEffect(() => {
-    fetchNotifications();
-    if (token && isAdmin) {
-      const interval = setInterval(fetchNotifications, 10000);
-      return () => clearInterval(interval);
-    }
-  }, [token, isAdmin]);
-
   if (!isAdmin) return null;
 
   return (
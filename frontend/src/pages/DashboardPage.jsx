@@ -8,7 +8,7 @@ import {
   ResponsiveContainer,
 } from "recharts";
 import LoadingSpinner from "@/components/common/LoadingSpinner";
-import { getStudentProfile } from "@/services/api";
+import { getStudentProfile, subscribeToStudent } from "@/services/api";
 import { getStudentId } from "@/services/authService";
 
 // Helper component for statistics cards
@@ -53,13 +53,17 @@ export default function DashboardPage() {
     }
   };
 
-  // ✅ Initial fetch + auto refresh every 10s
+  // ✅ Initial fetch
   useEffect(() => {
     fetchStudent();
-    const interval = setInterval(fetchStudent, 10000); // 10s polling
-    return () => clearInterval(interval);
   }, [studentId]);
 
+  // ✅ Refetch only when the server reports a change to this student
+  useEffect(() => {
+    if (!student?.id) return;
+    return subscribeToStudent(student.id, fetchStudent);
+  }, [student?.id]);
+
   if (loading) return <LoadingSpinner />;
 
   if (!student && !studentId) {
@@ -233,7 +233,7 @@ export default function ManageEvents() {
     const openParticipantsModal = async (eventId) => {
         try {
             const data = await apiFetch(`${API_BASE_URL}/events/${eventId}/participants`);
-            setParticipants(data);
+            setParticipants(data.participants);
             setIsParticipantsOpen(true);
         } catch (err) {
             showToast("Failed to load participants", "error");
@@ -1,9 +1,11 @@
 import axios from "axios";
 import { getToken } from "@/services/authService";
 
+export const API_BASE_URL = import.meta.env.VITE_API_URL || "http://127.0.0.1:8000/api";
+
 // ✅ Axios instance
 const API = axios.create({
-  baseURL: import.meta.env.VITE_API_URL || "http://127.0.0.1:8000/api",
+  baseURL: API_BASE_URL,
   headers: { "Content-Type": "application/json" },
 });
 
@@ -21,7 +23,7 @@ API.interceptors.request.use(
 export const getLeaderboard = async () => {
   try {
     const res = await API.get("/leaderboard/");
-    return res.data;
+    return res.data.entries; // paginated: { entries, next_cursor }
   } catch (err) {
     console.error("Error fetching leaderboard:", err);
     return [];
@@ -38,4 +40,12 @@ export const getStudentProfile = async (studentId) => {
   }
 };
 
+// ✅ Live updates (server-sent events) for one student's totals
+export const subscribeToStudent = (studentId, onChange) => {
+  const source = new EventSource(`${API_BASE_URL}/stream/students/${studentId}`);
+  source.addEventListener("totals", onChange);
+  source.addEventListener("reset", onChange);
+  return () => source.close();
+};
+
 export default API;